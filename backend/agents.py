@@ -1,35 +0,0 @@
-AGENTS = [
-    {
-        "id": "math",
-        "name": "Mathematics Agent",
-        "description": "Ask me about any math topic"
-    },
-    {
-        "id": "english",
-        "name": "English Agent",
-        "description": "Improve your grammar and writing"
-    },
-    {
-        "id": "physics",
-        "name": "Physics Agent",
-        "description": "Understand motion, force, and energy"
-    },
-    {
-        "id": "chemistry",
-        "name": "Chemistry Agent",
-        "description": "Learn about reactions and elements"
-    },
-    {
-        "id": "civic",
-        "name": "Civic Education Agent",
-        "description": "Learn about governance and rights"
-    }
-]
-
-SYSTEM_PROMPTS = {
-    "math": "You are a friendly AI math tutor. Explain concepts step-by-step.",
-    "english": "You are an English tutor. Help with grammar, comprehension, and writing.",
-    "physics": "You are a physics tutor. Use real-world examples.",
-    "chemistry": "You are a chemistry tutor. Explain reactions simply.",
-    "civic": "You are a civic education tutor. Explain governance and rights clearly."
-}
@@ -2,53 +2,238 @@
 Centralized exception handlers for the FastAPI application.
 Ensures consistent error response format across all endpoints.
 """
+import json
 import logging
 import asyncio
+from functools import lru_cache
 from typing import Optional, Dict, Any
-from fastapi import Request, status
-from fastapi.responses import JSONResponse
+import orjson
+from fastapi import Request, Response, params, status
+from fastapi.dependencies.utils import get_flat_dependant
+from fastapi.routing import APIRoute
 from fastapi.exceptions import RequestValidationError, HTTPException
 from pydantic import ValidationError
 
-from backend.models.responses import ErrorResponse, ErrorDetail
-
 
 logger = logging.getLogger(__name__)
 
 
-def create_detailed_error_response(
+# Fixed error messages and suggestions, built once at import
+VALIDATION_SUGGESTION = (
+    "Check the API documentation for required fields and data types. "
+    "Ensure all required fields are present and have the correct format."
+)
+TIMEOUT_UPLOAD_MESSAGE = "File processing timed out. The file may be too large or complex."
+TIMEOUT_UPLOAD_SUGGESTION = (
+    "Retry the request. Try with a smaller file, reduce file complexity "
+    "(fewer pages/lower resolution), or increase client timeout settings."
+)
+TIMEOUT_MESSAGE = "Request timed out. The operation took too long to complete."
+TIMEOUT_SUGGESTION = (
+    "Retry the request. Simplify your query, reduce the amount of data being "
+    "processed, or increase client timeout settings."
+)
+GENERAL_ERROR_MESSAGE = "An unexpected error occurred while processing your request"
+GENERAL_ERROR_SUGGESTION = "Please try again. If the issue persists, contact support with the error details."
+
+# Upper bound on request body bytes attached to validation error logs
+MAX_LOGGED_BODY_BYTES = 1024
+
+# Validation error responses echo at most this many field errors, and replace
+# echoed inputs longer than MAX_ECHOED_INPUT_LENGTH with a short placeholder
+MAX_VALIDATION_ERRORS = 5
+MAX_ECHOED_INPUT_LENGTH = 256
+
+# Client-facing suggestions for HTTP errors, by status code; other 5xx codes
+# fall back to SERVER_ERROR_SUGGESTION
+HTTP_SUGGESTIONS: dict[int, str] = {
+    404: "Verify the endpoint URL and any resource IDs (agent_id, session_id) are correct. Check the API documentation for valid endpoints.",
+    413: "Reduce the file size or compress the file before uploading. Maximum allowed size is 30 MB.",
+    422: "Ensure the file type is supported. Allowed types: PDF, PNG, JPG, JPEG, HEIC.",
+    429: "You've exceeded the rate limit. Wait a moment before retrying. Consider implementing exponential backoff in your client.",
+    504: "The request took too long to process. Try with a smaller file, simpler query, or retry the request.",
+}
+SERVER_ERROR_SUGGESTION = "This is a server-side error. Please try again in a few moments. If the issue persists, contact support."
+
+# (base classes, class name substrings, message, suggestion) for unexpected
+# errors. A type matches an entry if it subclasses one of the base classes or,
+# for third-party exceptions, its name contains one of the substrings.
+EXCEPTION_TYPE_HINTS: tuple[tuple[tuple[type, ...], tuple[str, ...], str, str], ...] = (
+    (
+        (ConnectionError,),
+        ("Connection", "Network"),
+        "Network or connection error occurred",
+        "Check network connectivity and ensure all required services (OpenAI API, database) are accessible. Verify API keys and credentials are correct."
+    ),
+    (
+        (TimeoutError,),
+        ("Timeout",),
+        "Operation timed out",
+        "The operation took too long. Try with smaller inputs or increase timeout settings."
+    ),
+    (
+        (MemoryError,),
+        ("Memory",),
+        "Memory limit exceeded",
+        "The operation required too much memory. Try processing smaller files or reducing batch sizes."
+    ),
+    (
+        (PermissionError,),
+        ("Permission", "Auth"),
+        "Permission or authentication error",
+        "Verify API keys and credentials are correctly configured in environment variables."
+    ),
+)
+
+_join_loc = " -> ".join
+
+# Integer range orjson can serialize; larger values raise JSONEncodeError
+_ORJSON_INT_MIN = -(2 ** 63)
+_ORJSON_INT_MAX = 2 ** 64 - 1
+
+
+def _fmt_loc(loc: tuple) -> str:
+    """Format a validation error location, dropping the leading 'body' segment."""
+    # Common case: a single top-level body field
+    if len(loc) == 2 and loc[0] == "body" and loc[1] != "body":
+        return str(loc[1])
+    return _join_loc([str(part) for part in loc if part != "body"]) or "request"
+
+
+def _echo_input(value: Any) -> Any:
+    """Return a validation error input, or a placeholder if it is too large to echo.
+    
+    Inputs orjson cannot encode (integers outside the 64-bit range, bytes,
+    sets) are echoed as strings.
+    """
+    if isinstance(value, int) and not isinstance(value, bool):
+        if _ORJSON_INT_MIN <= value <= _ORJSON_INT_MAX:
+            return value
+        value = str(value)
+    elif isinstance(value, (bytes, bytearray)):
+        value = bytes(value).decode("utf-8", errors="replace")
+    elif isinstance(value, (set, frozenset)):
+        value = repr(value)
+    
+    if isinstance(value, str):
+        too_large = len(value) > MAX_ECHOED_INPUT_LENGTH
+    elif isinstance(value, (list, dict)):
+        too_large = (
+            len(value) > MAX_ECHOED_INPUT_LENGTH
+            or len(repr(value)) > MAX_ECHOED_INPUT_LENGTH
+        )
+    else:
+        return value
+    return f"<{type(value).__name__} len={len(value)}>" if too_large else value
+
+
+@lru_cache(maxsize=256)
+def _exception_hint(exc_type: type) -> tuple[str, str]:
+    """
+    Resolve the message and suggestion reported for an unexpected error type.
+    
+    Results are cached per exception class, so repeated failures of the same
+    kind cost a single dict lookup.
+    
+    Args:
+        exc_type: Class of the unhandled exception
+        
+    Returns:
+        Tuple of (message, suggestion)
+    """
+    for base_classes, _, message, suggestion in EXCEPTION_TYPE_HINTS:
+        if issubclass(exc_type, base_classes):
+            return message, suggestion
+    
+    type_name = exc_type.__name__
+    for _, markers, message, suggestion in EXCEPTION_TYPE_HINTS:
+        if any(marker in type_name for marker in markers):
+            return message, suggestion
+    
+    return GENERAL_ERROR_MESSAGE, GENERAL_ERROR_SUGGESTION
+
+
+def _upload_route_ids(app: Any) -> frozenset[str]:
+    """
+    Get the unique IDs of the app's routes that take a file upload.
+    
+    Built from the route table on first use and stored on ``app.state``, so
+    the timeout handler classifies requests with a single set lookup. It is
+    not built in register_exception_handlers because routers are usually
+    included after the handlers are registered.
+    
+    Args:
+        app: The FastAPI application
+        
+    Returns:
+        Unique IDs of routes with at least one File() body parameter
+    """
+    route_ids = getattr(app.state, "upload_route_ids", None)
+    if route_ids is None:
+        route_ids = frozenset(
+            route.unique_id
+            for route in app.routes
+            if isinstance(route, APIRoute) and any(
+                isinstance(param.field_info, params.File)
+                for param in get_flat_dependant(route.dependant).body_params
+            )
+        )
+        app.state.upload_route_ids = route_ids
+    return route_ids
+
+
+def build_error_bytes(
     code: int,
     message: str,
     details: Optional[Dict[str, Any]] = None,
     suggestion: Optional[str] = None
-) -> ErrorResponse:
+) -> bytes:
     """
-    Create a detailed error response with helpful context for frontend developers.
+    Serialize an ErrorResponse-shaped body in a single orjson call.
+    
+    Handlers build these payloads themselves, so there is nothing for the
+    ErrorResponse/ErrorDetail models to validate. Empty optional fields are
+    reported as null, as in the models. Payloads orjson cannot encode fall
+    back to the stdlib json module.
     
     Args:
         code: HTTP status code
         message: Main error message
-        details: Additional error details (field errors, validation info, etc.)
+        details: Additional error details
         suggestion: Helpful suggestion for fixing the error
         
     Returns:
-        ErrorResponse with comprehensive error information
+        UTF-8 encoded JSON body
     """
-    error_detail = ErrorDetail(code=code, message=message)
-    
-    # Add optional fields if provided
-    if details:
-        error_detail.details = details
-    if suggestion:
-        error_detail.suggestion = suggestion
-    
-    return ErrorResponse(error=error_detail)
+    payload = {
+        "success": False,
+        "error": {
+            "code": code,
+            "message": message,
+            "details": details or None,
+            "suggestion": suggestion or None
+        }
+    }
+    try:
+        return orjson.dumps(
+            payload,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    except orjson.JSONEncodeError:
+        # Values orjson rejects (e.g. oversized ints nested in echoed input)
+        # still have to produce the error response rather than a 500
+        return json.dumps(payload, default=str, separators=(",", ":")).encode()
+
+
+def _error_response(code: int, body: bytes) -> Response:
+    """Wrap a pre-serialized JSON error body in a Response."""
+    return Response(content=body, status_code=code, media_type="application/json")
 
 
 async def validation_exception_handler(
     request: Request,
     exc: RequestValidationError
-) -> JSONResponse:
+) -> Response:
     """
     Handle Pydantic validation errors (400 Bad Request).
     
@@ -60,60 +245,118 @@ async def validation_exception_handler(
         exc: The validation exception
         
     Returns:
-        JSONResponse with 400 status and detailed validation errors
+        JSON response with 400 status and detailed validation errors
     """
+    path = request.url.path
+    method = request.method
+    
     # Extract validation error details
     errors = exc.errors()
     
-    # Build detailed error information for frontend developers
-    field_errors = []
-    for error in errors:
-        # Get the field path (excluding 'body')
-        field_path = [str(loc) for loc in error["loc"] if loc != "body"]
-        field_name = " -> ".join(field_path) if field_path else "request"
-        
-        field_errors.append({
-            "field": field_name,
+    # Build detailed error information for frontend developers; only the first
+    # few errors are echoed so garbage payloads cannot blow up the response
+    field_errors = [
+        {
+            "field": _fmt_loc(error["loc"]),
             "message": error["msg"],
             "type": error["type"],
-            "input": error.get("input")
-        })
+            "input": _echo_input(error.get("input"))
+        }
+        for error in errors[:MAX_VALIDATION_ERRORS]
+    ]
     
     # Build user-friendly main message
-    if len(field_errors) == 1:
+    if len(errors) == 1:
         error = field_errors[0]
         message = f"Validation error in '{error['field']}': {error['message']}"
     else:
-        message = f"Request validation failed with {len(field_errors)} error(s)"
+        message = f"Request validation failed with {len(errors)} error(s)"
     
     # Log the validation error
-    logger.warning(
-        f"Validation error for {request.method} {request.url.path}: {message}",
-        extra={"errors": errors, "request_body": await request.body()}
-    )
-    
-    # Create detailed error response
-    error_response = create_detailed_error_response(
-        code=status.HTTP_400_BAD_REQUEST,
-        message=message,
-        details={
-            "validation_errors": field_errors,
-            "endpoint": str(request.url.path),
-            "method": request.method
-        },
-        suggestion="Check the API documentation for required fields and data types. Ensure all required fields are present and have the correct format."
+    if logger.isEnabledFor(logging.WARNING):
+        extra = {"errors": errors}
+        # The raw body can be a large upload, so it is only captured, and then
+        # truncated, when debug logging is on
+        if logger.isEnabledFor(logging.DEBUG):
+            extra["request_body"] = (await request.body())[:MAX_LOGGED_BODY_BYTES]
+        logger.warning(
+            "Validation error for %s %s: %s",
+            method,
+            path,
+            message,
+            extra=extra
+        )
+    
+    return _error_response(
+        status.HTTP_400_BAD_REQUEST,
+        build_error_bytes(
+            code=status.HTTP_400_BAD_REQUEST,
+            message=message,
+            details={
+                "validation_errors": field_errors,
+                "endpoint": path,
+                "method": method,
+                "truncated": len(errors) > MAX_VALIDATION_ERRORS,
+                "total_errors": len(errors)
+            },
+            suggestion=VALIDATION_SUGGESTION
+        )
     )
+
+
+# ErrorResponse body for HTTP exceptions, with the variable parts spliced in
+_HTTP_ERROR_TEMPLATE = (
+    b'{"success":false,"error":{"code":%d,"message":%b,'
+    b'"details":{"endpoint":%b,"method":%b%b},"suggestion":%b}}'
+)
+_ENCODED_HTTP_SUGGESTIONS = {
+    status_code: orjson.dumps(suggestion)
+    for status_code, suggestion in HTTP_SUGGESTIONS.items()
+}
+_ENCODED_SERVER_SUGGESTION = orjson.dumps(SERVER_ERROR_SUGGESTION)
+
+
+@lru_cache(maxsize=256)
+def _http_error_body(
+    status_code: int,
+    message: str,
+    endpoint: str,
+    method: str,
+    retry_after: Optional[str] = None
+) -> bytes:
+    """
+    Serialize the ErrorResponse body for an HTTP exception.
     
-    return JSONResponse(
-        status_code=status.HTTP_400_BAD_REQUEST,
-        content=error_response.model_dump()
+    Args:
+        status_code: HTTP status code
+        message: The exception detail
+        endpoint: Request path
+        method: Request method
+        retry_after: Retry-After header value, only reported for 429 responses
+        
+    Returns:
+        UTF-8 encoded JSON body
+    """
+    # Only the message, endpoint, method and Retry-After vary; everything else
+    # comes from the pre-encoded template and suggestion fragments
+    suggestion = _ENCODED_HTTP_SUGGESTIONS.get(status_code)
+    if suggestion is None:
+        suggestion = _ENCODED_SERVER_SUGGESTION if status_code >= 500 else b"null"
+    
+    return _HTTP_ERROR_TEMPLATE % (
+        status_code,
+        orjson.dumps(message),
+        orjson.dumps(endpoint),
+        orjson.dumps(method),
+        b',"retry_after":' + orjson.dumps(retry_after) if status_code == 429 else b"",
+        suggestion
     )
 
 
 async def http_exception_handler(
     request: Request,
     exc: HTTPException
-) -> JSONResponse:
+) -> Response:
     """
     Handle HTTP exceptions (404, 403, etc.).
     
@@ -125,54 +368,44 @@ async def http_exception_handler(
         exc: The HTTP exception
         
     Returns:
-        JSONResponse with appropriate status code and error details
+        JSON response with appropriate status code and error details
     """
+    path = request.url.path
+    method = request.method
+    
     # Log the HTTP exception
     log_level = logging.WARNING if exc.status_code < 500 else logging.ERROR
     logger.log(
         log_level,
-        f"HTTP {exc.status_code} for {request.method} {request.url.path}: {exc.detail}"
+        "HTTP %d for %s %s: %s",
+        exc.status_code,
+        method,
+        path,
+        exc.detail
     )
     
-    # Add helpful suggestions based on status code
-    suggestion = None
-    details = {
-        "endpoint": str(request.url.path),
-        "method": request.method
-    }
-    
-    if exc.status_code == 404:
-        suggestion = "Verify the endpoint URL and any resource IDs (agent_id, session_id) are correct. Check the API documentation for valid endpoints."
-    elif exc.status_code == 413:
-        suggestion = "Reduce the file size or compress the file before uploading. Maximum allowed size is 30 MB."
-    elif exc.status_code == 422:
-        suggestion = "Ensure the file type is supported. Allowed types: PDF, PNG, JPG, JPEG, HEIC."
-    elif exc.status_code == 429:
-        suggestion = "You've exceeded the rate limit. Wait a moment before retrying. Consider implementing exponential backoff in your client."
-        details["retry_after"] = exc.headers.get("Retry-After") if hasattr(exc, "headers") else None
-    elif exc.status_code == 504:
-        suggestion = "The request took too long to process. Try with a smaller file, simpler query, or retry the request."
-    elif exc.status_code >= 500:
-        suggestion = "This is a server-side error. Please try again in a few moments. If the issue persists, contact support."
-    
-    # Create detailed error response
-    error_response = create_detailed_error_response(
-        code=exc.status_code,
-        message=str(exc.detail),
-        details=details,
-        suggestion=suggestion
-    )
-    
-    return JSONResponse(
-        status_code=exc.status_code,
-        content=error_response.model_dump()
+    retry_after = None
+    if exc.status_code == 429:
+        retry_after = exc.headers.get("Retry-After") if exc.headers else None
+    
+    # Most HTTP errors repeat the same canned detail for the same endpoint, so
+    # the serialized body is cached rather than rebuilt per request
+    return _error_response(
+        exc.status_code,
+        _http_error_body(
+            exc.status_code,
+            str(exc.detail),
+            path,
+            method,
+            retry_after
+        )
     )
 
 
 async def timeout_exception_handler(
     request: Request,
     exc: asyncio.TimeoutError
-) -> JSONResponse:
+) -> Response:
     """
     Handle AsyncIO timeout errors (504 Gateway Timeout).
     
@@ -184,49 +417,53 @@ async def timeout_exception_handler(
         exc: The timeout exception
         
     Returns:
-        JSONResponse with 504 status and helpful timeout message
+        JSON response with 504 status and helpful timeout message
     """
+    path = request.url.path
+    method = request.method
+    
     # Log the timeout
-    logger.warning(
-        f"Request timeout for {request.method} {request.url.path}",
-        extra={"exception_type": type(exc).__name__}
+    if logger.isEnabledFor(logging.WARNING):
+        logger.warning(
+            "Request timeout for %s %s",
+            method,
+            path,
+            extra={"exception_type": type(exc).__name__}
+        )
+    
+    # Determine timeout context based on the matched endpoint's parameters
+    route = request.scope.get("route")
+    is_file_upload = (
+        isinstance(route, APIRoute)
+        and route.unique_id in _upload_route_ids(request.app)
     )
     
-    # Determine timeout context based on endpoint
-    is_file_upload = "file" in str(request.url.path).lower() or request.method == "POST"
-    
-    message = "Request timed out while processing"
-    suggestion = "Retry the request. "
-    
     if is_file_upload:
-        message = "File processing timed out. The file may be too large or complex."
-        suggestion += "Try with a smaller file, reduce file complexity (fewer pages/lower resolution), or increase client timeout settings."
+        message = TIMEOUT_UPLOAD_MESSAGE
+        suggestion = TIMEOUT_UPLOAD_SUGGESTION
     else:
-        message = "Request timed out. The operation took too long to complete."
-        suggestion += "Simplify your query, reduce the amount of data being processed, or increase client timeout settings."
-    
-    # Create detailed error response
-    error_response = create_detailed_error_response(
-        code=status.HTTP_504_GATEWAY_TIMEOUT,
-        message=message,
-        details={
-            "endpoint": str(request.url.path),
-            "method": request.method,
-            "timeout_type": "processing"
-        },
-        suggestion=suggestion
-    )
-    
-    return JSONResponse(
-        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
-        content=error_response.model_dump()
+        message = TIMEOUT_MESSAGE
+        suggestion = TIMEOUT_SUGGESTION
+    
+    return _error_response(
+        status.HTTP_504_GATEWAY_TIMEOUT,
+        build_error_bytes(
+            code=status.HTTP_504_GATEWAY_TIMEOUT,
+            message=message,
+            details={
+                "endpoint": path,
+                "method": method,
+                "timeout_type": "processing"
+            },
+            suggestion=suggestion
+        )
     )
 
 
 async def general_exception_handler(
     request: Request,
     exc: Exception
-) -> JSONResponse:
+) -> Response:
     """
     Handle unexpected errors (500 Internal Server Error).
     
@@ -238,56 +475,84 @@ async def general_exception_handler(
         exc: The exception
         
     Returns:
-        JSONResponse with 500 status and helpful error message
+        JSON response with 500 status and helpful error message
     """
-    # Log the full exception with stack trace
-    logger.error(
-        f"Unexpected error for {request.method} {request.url.path}: {str(exc)}",
-        exc_info=True,
-        extra={
-            "exception_type": type(exc).__name__,
-            "exception_message": str(exc)
-        }
-    )
+    path = request.url.path
+    method = request.method
+    
+    # Log the full exception with stack trace; configure_logging installs a
+    # filter that drops the traceback when the same error repeats
+    if logger.isEnabledFor(logging.ERROR):
+        # The message is formatted by the log record itself via %s, so it is
+        # only stringified when the record is actually emitted
+        logger.error(
+            "Unexpected error for %s %s: %s",
+            method,
+            path,
+            exc,
+            exc_info=True,
+            extra={"exception_type": type(exc).__name__}
+        )
     
     # Provide helpful context based on exception type
-    exception_type = type(exc).__name__
-    message = "An unexpected error occurred while processing your request"
-    
+    message, suggestion = _exception_hint(type(exc))
     details = {
-        "endpoint": str(request.url.path),
-        "method": request.method,
-        "error_type": exception_type
+        "endpoint": path,
+        "method": method,
+        "error_type": type(exc).__name__
     }
     
-    # Add specific guidance for common exception types
-    suggestion = "Please try again. If the issue persists, contact support with the error details."
-    
-    if "Connection" in exception_type or "Network" in exception_type:
-        message = "Network or connection error occurred"
-        suggestion = "Check network connectivity and ensure all required services (OpenAI API, database) are accessible. Verify API keys and credentials are correct."
-    elif "Timeout" in exception_type:
-        message = "Operation timed out"
-        suggestion = "The operation took too long. Try with smaller inputs or increase timeout settings."
-    elif "Memory" in exception_type:
-        message = "Memory limit exceeded"
-        suggestion = "The operation required too much memory. Try processing smaller files or reducing batch sizes."
-    elif "Permission" in exception_type or "Auth" in exception_type:
-        message = "Permission or authentication error"
-        suggestion = "Verify API keys and credentials are correctly configured in environment variables."
-    
-    # Create detailed error response
-    error_response = create_detailed_error_response(
-        code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        message=message,
-        details=details,
-        suggestion=suggestion
+    return _error_response(
+        status.HTTP_500_INTERNAL_SERVER_ERROR,
+        build_error_bytes(
+            code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            message=message,
+            details=details,
+            suggestion=suggestion
+        )
     )
+
+
+async def warmup_exception_handlers(app) -> None:
+    """
+    Run each exception handler once against a synthetic request.
     
-    return JSONResponse(
-        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        content=error_response.model_dump()
+    The first error a process handles otherwise pays for one-off work such as
+    the upload-route scan and orjson's first calls. Call this during
+    application startup, after the routers are included, so that cost is
+    paid before real traffic. Handler logging is muted while warming up.
+    
+    Args:
+        app: The FastAPI application whose handlers and routes are warmed
+    """
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+    
+    # Attaching a real route makes the timeout handler fill the app's cached
+    # upload-route IDs, just as it would for a live request
+    route = next((route for route in app.routes if isinstance(route, APIRoute)), None)
+    request = Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "query_string": b"",
+            "headers": [],
+            "app": app,
+            "route": route
+        },
+        receive
     )
+    
+    was_disabled = logger.disabled
+    logger.disabled = True
+    try:
+        await validation_exception_handler(request, RequestValidationError([]))
+        await http_exception_handler(request, HTTPException(status_code=404, detail="Not Found"))
+        await timeout_exception_handler(request, asyncio.TimeoutError())
+        await general_exception_handler(request, RuntimeError("warmup"))
+    finally:
+        logger.disabled = was_disabled
 
 
 def register_exception_handlers(app) -> None:
@@ -295,7 +560,10 @@ def register_exception_handlers(app) -> None:
     Register all exception handlers with the FastAPI application.
     
     This function should be called during application initialization
-    to ensure all exceptions are handled consistently.
+    to ensure all exceptions are handled consistently. The handlers serialize
+    error bodies with orjson rather than the stdlib json module; the app
+    should also be created with
+    ``default_response_class=ORJSONResponse`` so route responses do the same.
     
     Args:
         app: The FastAPI application instance
@@ -303,6 +571,11 @@ def register_exception_handlers(app) -> None:
     app.add_exception_handler(RequestValidationError, validation_exception_handler)
     app.add_exception_handler(HTTPException, http_exception_handler)
     app.add_exception_handler(asyncio.TimeoutError, timeout_exception_handler)
+    # Builtin failure classes with their own hints are registered directly, so
+    # they are handled like other known errors instead of falling through to
+    # the catch-all Exception handler in ServerErrorMiddleware
+    for exc_class in (ConnectionError, MemoryError, PermissionError):
+        app.add_exception_handler(exc_class, general_exception_handler)
     app.add_exception_handler(Exception, general_exception_handler)
     
     logger.info("Exception handlers registered successfully")
@@ -7,14 +7,15 @@ This module provides endpoints for listing available agents and chatting with th
 import asyncio
 import logging
 import time
-import json
-from datetime import datetime
-from fastapi import APIRouter, HTTPException, Depends, Form, File, UploadFile
-from fastapi.responses import StreamingResponse
-from typing import Annotated, Optional
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import orjson
+from fastapi import APIRouter, HTTPException, Depends, Form, File, Query, UploadFile, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import Annotated, AsyncIterator, Awaitable, Optional, TypeVar
 
 from backend.config import Settings, get_settings
-from backend.models.responses import SuccessResponse, AgentResponse
+from backend.models.responses import SuccessResponse
 from backend.services.ai_service import AIService
 from backend.services.rag_service import RAGService
 from backend.agents.config import AgentManager
@@ -28,6 +29,34 @@ router = APIRouter(prefix="/api/v1/agents", tags=["agents"])
 MAX_FILE_SIZE = 30 * 1024 * 1024  # 30 MB
 ALLOWED_PDF_TYPES = ["application/pdf"]
 ALLOWED_IMAGE_TYPES = ["image/png", "image/jpeg", "image/jpg", "image/heic"]
+UPLOAD_READ_CHUNK_SIZE = 1024 * 1024  # 1 MB
+SNIFF_BYTES = 512  # Leading bytes checked against known file signatures
+
+# ISO base media "ftyp" brands used by HEIC/HEIF images
+HEIC_BRANDS = (b"heic", b"heix", b"hevc", b"hevx", b"heim", b"heis", b"mif1", b"msf1")
+
+# Constant envelope around streamed text chunks: data: {"chunk":<text>}
+CHUNK_FRAME_PREFIX = b'data: {"chunk":'
+CHUNK_FRAME_SUFFIX = b'}\n\n'
+
+# Tells the client to discard the chunks streamed so far, before a fallback answer
+RESET_FRAME = b'data: {"reset":true}\n\n'
+
+# SuccessResponse body for GET /agents around the manager's pre-encoded listing
+AGENTS_LIST_BODY_TEMPLATE = (
+    b'{"success":true,"data":{"agents":%b},'
+    b'"message":"Found %d available agents","privacy":null}'
+)
+
+# Seconds of stream inactivity before a keep-alive comment frame is sent
+SSE_PING_INTERVAL = 15
+SSE_PING_FRAME = b": ping\n\n"
+
+# Error message used when a chat request exceeds its end-to-end deadline
+CHAT_TIMEOUT_MESSAGE = (
+    "Request timed out after {timeout} seconds. "
+    "Please try again or simplify your question."
+)
 
 
 def validate_file(file: UploadFile) -> None:
@@ -49,97 +78,342 @@ def validate_file(file: UploadFile) -> None:
         )
 
 
+def sniff_file_type(prefix: bytes) -> Optional[str]:
+    """Detect a supported file type from its leading bytes.
+    
+    Args:
+        prefix: The first bytes of the file
+    
+    Returns:
+        The detected MIME type, or None if the signature is not a supported type
+    """
+    if prefix.startswith(b"%PDF"):
+        return "application/pdf"
+    if prefix.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if prefix.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if prefix[4:8] == b"ftyp" and prefix[8:12] in HEIC_BRANDS:
+        return "image/heic"
+    return None
 
 
-# Dependency for getting services
-# These will be initialized in main.py and injected
-_agent_manager: AgentManager = None
-_ai_service: AIService = None
-_rag_service: RAGService = None
+def validate_file_signature(file: UploadFile, prefix: bytes) -> None:
+    """Validate that an upload's content matches its declared file type.
+    
+    Args:
+        file: The uploaded file
+        prefix: The first SNIFF_BYTES bytes of the file
+    
+    Raises:
+        HTTPException: If the content is not a supported type or does not
+            match the declared PDF/image type
+    """
+    sniffed_type = sniff_file_type(prefix)
+    declared_pdf = file.content_type in ALLOWED_PDF_TYPES
+    if sniffed_type is None or (sniffed_type in ALLOWED_PDF_TYPES) != declared_pdf:
+        raise HTTPException(
+            status_code=422,
+            detail=f"File content does not match its declared type '{file.content_type}'. "
+                   f"Supported types: PDF, PNG, JPG, JPEG, HEIC. "
+                   f"Ensure your file has the correct MIME type and extension."
+        )
 
 
-def set_services(agent_manager: AgentManager, ai_service: AIService, rag_service: RAGService):
-    """Set the service instances for dependency injection.
+async def read_upload(file: UploadFile) -> bytearray:
+    """Read an uploaded file in chunks, stopping just past the size limit.
     
-    This function should be called during application startup to initialize
-    the services that will be used by the router endpoints.
+    The multipart parser has already spooled the upload to a temporary file;
+    reading it back chunk by chunk means an oversized upload never costs more
+    than MAX_FILE_SIZE + one chunk of memory. The leading bytes are checked
+    against the declared file type first, so mismatched uploads are rejected
+    before the rest of the file is read.
     
     Args:
-        agent_manager: The AgentManager instance
-        ai_service: The AIService instance
-        rag_service: The RAGService instance
+        file: The uploaded file
+    
+    Returns:
+        The file content, or its first MAX_FILE_SIZE + 1 or more bytes if the
+        file exceeds MAX_FILE_SIZE. The read buffer is returned as-is rather
+        than copied into ``bytes``, so a large upload is held in memory once.
+    
+    Raises:
+        HTTPException: If a non-empty file's content does not match its type
     """
-    global _agent_manager, _ai_service, _rag_service
-    _agent_manager = agent_manager
-    _ai_service = ai_service
-    _rag_service = rag_service
-    logger.info("Agents router services initialized (including RAG service)")
+    buffer = bytearray(await file.read(SNIFF_BYTES))
+    if buffer:
+        validate_file_signature(file, bytes(buffer))
+    
+    while len(buffer) <= MAX_FILE_SIZE:
+        chunk = await file.read(UPLOAD_READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer += chunk
+    return buffer
+
+
+def _utc_timestamp() -> str:
+    """Return the current UTC time as an ISO 8601 string with a ``Z`` suffix.
+    
+    Returns:
+        Timestamp such as ``2025-11-06T10:30:00.123456Z``
+    """
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
 
 
-def get_agent_manager() -> AgentManager:
-    """Dependency to get the AgentManager instance.
+def _elapsed_ms(start_ns: int) -> int:
+    """Return whole milliseconds elapsed since a ``perf_counter_ns`` reading.
+    
+    Args:
+        start_ns: Value of ``time.perf_counter_ns()`` taken at the start
     
     Returns:
-        The AgentManager instance
+        Elapsed time in milliseconds
+    """
+    return (time.perf_counter_ns() - start_ns) // 1_000_000
+
+
+def _build_reply(
+    agent,
+    *,
+    mode: str,
+    message_type: str,
+    user_message: str,
+    reply: str,
+    processing_time_ms: int,
+    session_id: Optional[str] = None,
+    source_chunks: Optional[list] = None,
+    metadata: Optional[dict] = None
+) -> dict:
+    """Build the data payload shared by every chat reply.
     
-    Raises:
-        HTTPException: If the service is not initialized
+    Args:
+        agent: The AgentConfig that handled the message
+        mode: "general" or "document"
+        message_type: "text", "answer" or "file_ack"
+        user_message: The user's original message
+        reply: The reply text
+        processing_time_ms: Time spent handling the request
+        session_id: Document session to return, if any
+        source_chunks: Document excerpts the answer was based on, if any
+        metadata: Extra metadata merged after processing_time_ms
+    
+    Returns:
+        Reply data dictionary
     """
-    if _agent_manager is None:
-        logger.error("AgentManager not initialized")
-        raise HTTPException(
-            status_code=500,
-            detail="AgentManager service not initialized. This is a server configuration issue. "
-                   "Ensure the application started correctly and all dependencies are loaded."
-        )
-    return _agent_manager
+    data = {
+        "agent_id": agent.id,
+        "agent_name": agent.name,
+        "mode": mode,
+        "message_type": message_type,
+        "user_message": user_message,
+        "reply": reply
+    }
+    if session_id is not None:
+        data["session_id"] = session_id
+    if source_chunks is not None:
+        data["source_chunks"] = source_chunks
+    data["timestamp"] = _utc_timestamp()
+    data["metadata"] = {"processing_time_ms": processing_time_ms, **(metadata or {})}
+    return data
+
+
+def _success_response(data: dict, message: str, privacy: Optional[str] = None) -> ORJSONResponse:
+    """Build a chat success response without constructing a SuccessResponse model.
+    
+    Args:
+        data: Response data
+        message: Success message
+        privacy: Optional privacy guarantee message
+    
+    Returns:
+        ORJSONResponse with the SuccessResponse shape
+    """
+    return ORJSONResponse({"success": True, "data": data, "message": message, "privacy": privacy})
+
+
+T = TypeVar("T")
 
 
-def get_ai_service() -> AIService:
-    """Dependency to get the AIService instance.
+async def _within(deadline: float, timeout: int, awaitable: Awaitable[T]) -> T:
+    """Await a step of a chat request within the request's overall deadline.
+    
+    Timeouts raised by the awaited service keep their own message; running
+    out of overall budget raises a timeout naming the end-to-end limit.
+    
+    Args:
+        deadline: time.monotonic() value by which the request must finish
+        timeout: The end-to-end timeout in seconds, used in the error message
+        awaitable: The work to await
     
     Returns:
-        The AIService instance
+        The awaitable's result
     
     Raises:
-        HTTPException: If the service is not initialized
+        asyncio.TimeoutError: If the deadline passes first
     """
-    if _ai_service is None:
-        logger.error("AIService not initialized")
-        raise HTTPException(
-            status_code=500,
-            detail="AIService not initialized. This is a server configuration issue. "
-                   "Verify OPENAI_API_KEY is set and the application started correctly."
-        )
-    return _ai_service
+    try:
+        return await asyncio.wait_for(awaitable, timeout=max(deadline - time.monotonic(), 0))
+    except asyncio.TimeoutError as e:
+        if e.args:
+            raise
+        raise asyncio.TimeoutError(CHAT_TIMEOUT_MESSAGE.format(timeout=timeout)) from None
 
 
-def get_rag_service() -> RAGService:
-    """Dependency to get the RAGService instance.
+async def _stream_within(
+    events: AsyncIterator[bytes],
+    deadline: float,
+    timeout: int
+) -> AsyncIterator[bytes]:
+    """Forward SSE frames until the request's overall deadline passes.
+    
+    While the next frame is slow to arrive (document processing, the model's
+    first token) a comment frame is sent every SSE_PING_INTERVAL seconds so
+    proxies do not drop the idle connection. On timeout the wrapped generator
+    is cancelled and a final 504 error frame is sent in its place.
+    
+    Args:
+        events: SSE frame generator
+        deadline: time.monotonic() value by which the stream must finish
+        timeout: The end-to-end timeout in seconds, used in the error message
+    
+    Yields:
+        The wrapped generator's frames, interleaved with keep-alive pings
+    """
+    pending: Optional[asyncio.Future] = None
+    try:
+        while True:
+            pending = asyncio.ensure_future(events.__anext__())
+            while True:
+                remaining = deadline - time.monotonic()
+                done, _ = await asyncio.wait(
+                    (pending,),
+                    timeout=max(min(remaining, SSE_PING_INTERVAL), 0)
+                )
+                if done:
+                    break
+                if time.monotonic() >= deadline:
+                    raise asyncio.TimeoutError(CHAT_TIMEOUT_MESSAGE.format(timeout=timeout))
+                yield SSE_PING_FRAME
+            try:
+                frame = pending.result()
+            except StopAsyncIteration:
+                return
+            yield frame
+    except asyncio.TimeoutError as e:
+        logger.warning("Streaming request exceeded its deadline: %s", e)
+        yield _sse({'error': str(e), 'code': 504})
+    finally:
+        if pending is not None and not pending.done():
+            # The generator cannot be closed while a step is still running
+            pending.cancel()
+            await asyncio.wait((pending,))
+            if not pending.cancelled():
+                pending.exception()
+        await events.aclose()
+
+
+def _sse(payload: dict) -> bytes:
+    """Encode a payload as a Server-Sent Events data frame.
+    
+    Args:
+        payload: JSON-serializable event data
+    
+    Returns:
+        The encoded ``data:`` frame including the blank-line terminator
+    """
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+def _sse_chunk(text: str) -> bytes:
+    """Encode a streamed text chunk as a ``{"chunk": ...}`` SSE frame.
+    
+    Produces the same bytes as ``_sse({'chunk': text})`` but only serializes
+    the string itself, since the envelope around it never changes.
+    
+    Args:
+        text: Chunk of reply text
+    
+    Returns:
+        The encoded ``data:`` frame including the blank-line terminator
+    """
+    return CHUNK_FRAME_PREFIX + orjson.dumps(text) + CHUNK_FRAME_SUFFIX
+
+
+def _agent_not_found(agent_manager: AgentManager, agent_id: str) -> HTTPException:
+    """Build the 404 error for an unknown or disabled agent.
+    
+    Args:
+        agent_manager: Manager that describes why the agent is unavailable
+        agent_id: The requested agent ID
     
     Returns:
-        The RAGService instance
+        HTTPException with status 404
+    """
+    message = agent_manager.unavailable_message(agent_id)
+    logger.warning("Agent unavailable: %s", message)
+    return HTTPException(status_code=404, detail=message)
+
+
+@dataclass(frozen=True, slots=True)
+class Services:
+    """Service instances used by the agents router.
+    
+    Resolved once at startup so each request pays for a single dependency
+    instead of one lookup per service.
+    """
+    agent_manager: AgentManager
+    ai_service: AIService
+    rag_service: RAGService
+
+
+# Set by main.py during startup and injected through get_services
+_services: Optional[Services] = None
+
+
+def set_services(agent_manager: AgentManager, ai_service: AIService, rag_service: RAGService):
+    """Set the service instances for dependency injection.
+    
+    This function should be called during application startup to initialize
+    the services that will be used by the router endpoints.
+    
+    Args:
+        agent_manager: The AgentManager instance
+        ai_service: The AIService instance
+        rag_service: The RAGService instance
+    """
+    global _services
+    _services = Services(agent_manager, ai_service, rag_service)
+    logger.info("Agents router services initialized (including RAG service)")
+
+
+def get_services() -> Services:
+    """Dependency to get the router's service instances.
+    
+    Returns:
+        The Services bundle registered by set_services
     
     Raises:
-        HTTPException: If the service is not initialized
+        HTTPException: If the services are not initialized
     """
-    if _rag_service is None:
-        logger.error("RAGService not initialized")
+    if _services is None:
+        logger.error("Agents router services not initialized")
         raise HTTPException(
             status_code=500,
-            detail="RAGService not initialized. This is a server configuration issue. "
-                   "Verify OPENAI_API_KEY is set and the application started correctly."
+            detail="Agent services not initialized. This is a server configuration issue. "
+                   "Verify GEMINI_API_KEY is set and the application started correctly."
         )
-    return _rag_service
+    return _services
 
 
 @router.get(
     "/",
-    response_model=SuccessResponse,
+    response_model=None,
     summary="List all available agents",
     description="Returns a list of all enabled AI agents with their metadata",
     responses={
         200: {
+            "model": SuccessResponse,
             "description": "Successfully retrieved agent list",
             "content": {
                 "application/json": {
@@ -181,12 +455,14 @@ def get_rag_service() -> RAGService:
     }
 )
 async def list_agents(
-    agent_manager: Annotated[AgentManager, Depends(get_agent_manager)]
-) -> SuccessResponse:
+    services: Annotated[Services, Depends(get_services)]
+) -> Response:
     """List all available AI agents.
     
     This endpoint returns metadata for all enabled agents including their ID,
     name, and description. Disabled agents are not included in the response.
+    The agent set is fixed for the life of the manager, so the listing is
+    serialized once by the manager and only wrapped in the envelope here.
     
     **Example Request:**
     ```bash
@@ -216,27 +492,27 @@ async def list_agents(
     ```
     
     Args:
-        agent_manager: Injected AgentManager dependency
+        services: Injected service instances
     
     Returns:
-        SuccessResponse containing list of agent metadata
+        JSON response with the SuccessResponse shape containing agent metadata
     """
     logger.info("Listing all available agents")
     
     try:
-        # Get list of enabled agents
-        agents = agent_manager.list_agents(include_disabled=False)
-        
-        logger.info(f"Successfully listed {len(agents)} agents")
-        
-        return SuccessResponse(
-            success=True,
-            data={"agents": agents},
-            message=f"Found {len(agents)} available agents"
+        # The manager serializes the enabled-agent listing once at construction
+        agent_manager = services.agent_manager
+        agent_count = agent_manager.get_agent_count()
+        body = AGENTS_LIST_BODY_TEMPLATE % (
+            agent_manager.list_agents_json(include_disabled=False),
+            agent_count
         )
+        logger.info("Successfully listed %d agents", agent_count)
+        
+        return Response(content=body, media_type="application/json")
     
     except Exception as e:
-        logger.error(f"Error listing agents: {e}", exc_info=True)
+        logger.error("Error listing agents: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail="Failed to retrieve agent list"
@@ -245,11 +521,13 @@ async def list_agents(
 
 @router.post(
     "/{agent_id}",
-    response_model=SuccessResponse,
+    response_model=None,
+    response_class=ORJSONResponse,
     summary="Chat with a specific agent (with file upload support)",
     description="Send a message to a specific AI agent with optional file upload and document context",
     responses={
         200: {
+            "model": SuccessResponse,
             "description": "Successfully generated response",
             "content": {
                 "application/json": {
@@ -330,13 +608,13 @@ async def list_agents(
 )
 async def chat_with_agent(
     agent_id: str,
-    agent_manager: Annotated[AgentManager, Depends(get_agent_manager)],
-    ai_service: Annotated[AIService, Depends(get_ai_service)],
-    rag_service: Annotated[RAGService, Depends(get_rag_service)],
+    services: Annotated[Services, Depends(get_services)],
+    settings: Annotated[Settings, Depends(get_settings)],
     message: str = Form(..., description="User message"),
     session_id: Optional[str] = Form(None, description="Optional session ID for document context"),
-    file: Optional[UploadFile] = File(None, description="Optional PDF or image file")
-) -> SuccessResponse:
+    file: Optional[UploadFile] = File(None, description="Optional PDF or image file"),
+    nocache: bool = Query(False, description="Bypass cached replies to repeated questions")
+) -> ORJSONResponse:
     """Send a message to a specific AI agent with optional file upload and document context.
     
     This enhanced endpoint supports three modes:
@@ -377,40 +655,52 @@ async def chat_with_agent(
         message: User's message or question
         session_id: Optional session ID for document context
         file: Optional PDF or image file upload
-        agent_manager: Injected AgentManager dependency
-        ai_service: Injected AIService dependency
-        rag_service: Injected RAGService dependency
+        nocache: Whether to bypass cached replies for general questions
+        services: Injected service instances
+        settings: Injected application settings
     
     Returns:
-        SuccessResponse with mode, message_type, and appropriate response data
+        JSON response with the SuccessResponse shape, mode, message_type, and
+        appropriate response data
     
     Raises:
         HTTPException: Various status codes for different error conditions
     """
-    logger.info(f"Enhanced chat request for agent '{agent_id}' (file={file is not None}, session={session_id})")
+    agent_manager = services.agent_manager
+    ai_service = services.ai_service
+    rag_service = services.rag_service
+    
+    logger.info(
+        "Enhanced chat request for agent '%s' (file=%s, session=%s)",
+        agent_id, file is not None, session_id
+    )
     
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
+    chat_timeout = settings.chat_timeout
+    deadline = time.monotonic() + chat_timeout
+    
+    # Reject unknown or disabled agents with a single lookup, before any work
+    agent = agent_manager.find_enabled(agent_id)
+    if agent is None:
+        raise _agent_not_found(agent_manager, agent_id)
     
     try:
-        # Validate agent exists and is enabled
-        agent = agent_manager.get_agent(agent_id)
-        
         # CASE 1: File Upload - Process document and create session
         if file is not None:
-            logger.info(f"Processing file upload: {file.filename}")
+            logger.info("Processing file upload: %s", file.filename)
             
             # Validate file type
             validate_file(file)
             
             # Read file content
-            file_bytes = await file.read()
+            file_bytes = await read_upload(file)
             file_size = len(file_bytes)
             
             # Validate file size
             if file_size > MAX_FILE_SIZE:
                 raise HTTPException(
                     status_code=413,
-                    detail=f"File too large: {file_size / 1024 / 1024:.1f} MB. "
+                    detail=f"File too large: {(file.size or file_size) / 1024 / 1024:.1f} MB. "
                            f"Maximum allowed: {MAX_FILE_SIZE / 1024 / 1024:.0f} MB. "
                            f"Compress the file or reduce its size before uploading."
                 )
@@ -421,21 +711,21 @@ async def chat_with_agent(
                     detail="File is empty (0 bytes). Ensure the file contains data and was uploaded correctly."
                 )
             
-            logger.info(f"File validated: size={file_size / 1024:.1f} KB")
+            logger.info("File validated: size=%.1f KB", file_size / 1024)
             
             # Process based on file type
             if file.content_type in ALLOWED_PDF_TYPES:
-                new_session_id = await rag_service.process_pdf(file_bytes)
+                new_session_id = await _within(deadline, chat_timeout, rag_service.process_pdf(file_bytes))
                 doc_type = "pdf"
             else:
-                new_session_id = await rag_service.process_image(file_bytes)
+                new_session_id = await _within(deadline, chat_timeout, rag_service.process_image(file_bytes))
                 doc_type = "image"
             
             # Get session info
             session_info = rag_service.session_manager.get_session_info(new_session_id)
             
             # Calculate processing time
-            processing_time_ms = int((time.time() - start_time) * 1000)
+            processing_time_ms = _elapsed_ms(start_ns)
             
             # Generate acknowledgment message
             if doc_type == "pdf":
@@ -444,32 +734,26 @@ async def chat_with_agent(
             else:
                 ack_message = "I've processed your image. I can help you understand what's in it. What would you like to know?"
             
-            logger.info(f"File processed successfully: session={new_session_id}, time={processing_time_ms}ms")
+            logger.info("File processed successfully: session=%s, time=%dms", new_session_id, processing_time_ms)
             
-            return SuccessResponse(
-                success=True,
-                data={
-                    "agent_id": agent.id,
-                    "agent_name": agent.name,
-                    "mode": "document",
-                    "message_type": "file_ack",
-                    "user_message": message,
-                    "reply": ack_message,
-                    "session_id": new_session_id,
-                    "timestamp": datetime.utcnow().isoformat() + "Z",
-                    "metadata": {
-                        "processing_time_ms": processing_time_ms,
-                        "document_type": doc_type,
-                        **session_info.get("metadata", {})
-                    }
-                },
+            return _success_response(
+                data=_build_reply(
+                    agent,
+                    mode="document",
+                    message_type="file_ack",
+                    user_message=message,
+                    reply=ack_message,
+                    processing_time_ms=processing_time_ms,
+                    session_id=new_session_id,
+                    metadata={"document_type": doc_type, **session_info.get("metadata", {})}
+                ),
                 message="Document processed successfully",
                 privacy="Uploaded file is processed in memory only and will be removed after 20 minutes."
             )
         
         # CASE 2: Query with Session Context
         elif session_id is not None:
-            logger.info(f"Processing query with session: {session_id}")
+            logger.info("Processing query with session: %s", session_id)
             
             # Validate session exists
             session = rag_service.session_manager.get_session(session_id)
@@ -481,109 +765,95 @@ async def chat_with_agent(
                            f"Upload a new document to create a new session."
                 )
             
-            # Always try RAG first when session is active
+            # Try RAG unless the query clearly has nothing to do with the document
             # The RAG service will intelligently determine if query is about the document
-            logger.info(f"Querying document session with intelligent fallback")
-            result = await rag_service.query_session(
-                session_id=session_id,
-                query=message,
-                top_k=5
-            )
+            result = None
+            if await _within(
+                deadline, chat_timeout, rag_service.is_probably_document_query(session_id, message)
+            ):
+                logger.info("Querying document session with intelligent fallback")
+                result = await _within(deadline, chat_timeout, rag_service.query_session(
+                    session_id=session_id,
+                    query=message,
+                    top_k=5
+                ))
+            else:
+                logger.info("Query is unrelated to the document, skipping retrieval")
             
             # Check if RAG determined this is a general query (not about document)
-            if result["reply"] is None or result["metadata"].get("fallback_to_general"):
+            if result is None or result["reply"] is None or result["metadata"].get("fallback_to_general"):
                 # Fallback to general agent chat
-                logger.info(f"RAG detected general query, using agent mode")
-                reply = await ai_service.generate_response(agent_id, message)
+                logger.info("RAG detected general query, using agent mode")
+                reply = await _within(
+                    deadline, chat_timeout, ai_service.generate_response(agent_id, message, use_cache=not nocache)
+                )
                 
-                processing_time_ms = int((time.time() - start_time) * 1000)
+                processing_time_ms = _elapsed_ms(start_ns)
                 
-                return SuccessResponse(
-                    success=True,
-                    data={
-                        "agent_id": agent.id,
-                        "agent_name": agent.name,
-                        "mode": "general",
-                        "message_type": "text",
-                        "user_message": message,
-                        "reply": reply,
-                        "session_id": session_id,  # Keep session alive
-                        "timestamp": datetime.utcnow().isoformat() + "Z",
-                        "metadata": {
-                            "processing_time_ms": processing_time_ms,
-                            "fallback_reason": "general_knowledge_query"
-                        }
-                    },
+                return _success_response(
+                    data=_build_reply(
+                        agent,
+                        mode="general",
+                        message_type="text",
+                        user_message=message,
+                        reply=reply,
+                        processing_time_ms=processing_time_ms,
+                        session_id=session_id,  # Keep session alive
+                        metadata={"fallback_reason": "general_knowledge_query"}
+                    ),
                     message="Response generated successfully"
                 )
             
             # Document-based answer
-            processing_time_ms = int((time.time() - start_time) * 1000)
+            processing_time_ms = _elapsed_ms(start_ns)
             
-            return SuccessResponse(
-                success=True,
-                data={
-                    "agent_id": agent.id,
-                    "agent_name": agent.name,
-                    "mode": "document",
-                    "message_type": "answer",
-                    "user_message": message,
-                    "reply": result["reply"],
-                    "session_id": session_id,
-                    "source_chunks": result["source_chunks"],
-                    "timestamp": datetime.utcnow().isoformat() + "Z",
-                    "metadata": {
-                        "processing_time_ms": processing_time_ms,
-                        "chunks_retrieved": result["metadata"].get("chunks_retrieved", 0)
-                    }
-                },
+            return _success_response(
+                data=_build_reply(
+                    agent,
+                    mode="document",
+                    message_type="answer",
+                    user_message=message,
+                    reply=result["reply"],
+                    processing_time_ms=processing_time_ms,
+                    session_id=session_id,
+                    source_chunks=result["source_chunks"],
+                    metadata={"chunks_retrieved": result["metadata"].get("chunks_retrieved", 0)}
+                ),
                 message="Answer generated from document"
-                )
+            )
         
         # CASE 3: Standard Chat (no file, no session) - Backward compatible
         else:
-            logger.info(f"Processing standard chat request")
+            logger.info("Processing standard chat request")
             
             # Generate AI response
-            reply = await ai_service.generate_response(agent_id, message)
+            reply = await _within(
+                deadline, chat_timeout, ai_service.generate_response(agent_id, message, use_cache=not nocache)
+            )
             
             # Calculate processing time
-            processing_time_ms = int((time.time() - start_time) * 1000)
+            processing_time_ms = _elapsed_ms(start_ns)
             
-            logger.info(f"Successfully generated response for agent '{agent_id}' in {processing_time_ms}ms")
+            logger.info("Successfully generated response for agent '%s' in %dms", agent_id, processing_time_ms)
             
-            return SuccessResponse(
-                success=True,
-                data={
-                    "agent_id": agent.id,
-                    "agent_name": agent.name,
-                    "mode": "general",
-                    "message_type": "text",
-                    "user_message": message,
-                    "reply": reply,
-                    "timestamp": datetime.utcnow().isoformat() + "Z",
-                    "metadata": {
-                        "processing_time_ms": processing_time_ms
-                    }
-                },
+            return _success_response(
+                data=_build_reply(
+                    agent,
+                    mode="general",
+                    message_type="text",
+                    user_message=message,
+                    reply=reply,
+                    processing_time_ms=processing_time_ms
+                ),
                 message="Response generated successfully"
             )
     
     except HTTPException:
         raise
     
-    except KeyError as e:
-        # Agent not found or disabled
-        logger.warning(f"Agent not found: {e}")
-        available_agents = ", ".join(agent_manager.list_agent_ids())
-        raise HTTPException(
-            status_code=404,
-            detail=f"Agent '{agent_id}' not found. Available agents: {available_agents}"
-        )
-    
     except asyncio.TimeoutError as e:
         # Request timeout
-        logger.warning(f"Request timeout for agent '{agent_id}': {e}")
+        logger.warning("Request timeout for agent '%s': %s", agent_id, e)
         raise HTTPException(
             status_code=504,
             detail=str(e)
@@ -592,7 +862,7 @@ async def chat_with_agent(
     except Exception as e:
         # Other errors
         logger.error(
-            f"Error processing chat request for agent '{agent_id}': {e}",
+            "Error processing chat request for agent '%s': %s", agent_id, e,
             exc_info=True
         )
         raise HTTPException(
@@ -627,12 +897,12 @@ async def chat_with_agent(
 )
 async def chat_with_agent_stream(
     agent_id: str,
-    agent_manager: Annotated[AgentManager, Depends(get_agent_manager)],
-    ai_service: Annotated[AIService, Depends(get_ai_service)],
-    rag_service: Annotated[RAGService, Depends(get_rag_service)],
+    services: Annotated[Services, Depends(get_services)],
+    settings: Annotated[Settings, Depends(get_settings)],
     message: str = Form(..., description="User message"),
     session_id: Optional[str] = Form(None, description="Optional session ID for document context"),
-    file: Optional[UploadFile] = File(None, description="Optional PDF or image file")
+    file: Optional[UploadFile] = File(None, description="Optional PDF or image file"),
+    nocache: bool = Query(False, description="Bypass cached replies to repeated questions")
 ):
     """Send a message to a specific AI agent with optional file upload and get a streaming response.
     
@@ -657,9 +927,9 @@ async def chat_with_agent_stream(
         message: User's message or question
         session_id: Optional session ID for document context
         file: Optional PDF or image file upload
-        agent_manager: Injected AgentManager dependency
-        ai_service: Injected AIService dependency
-        rag_service: Injected RAGService dependency
+        nocache: Whether to bypass cached replies for general questions
+        services: Injected service instances
+        settings: Injected application settings
     
     Returns:
         StreamingResponse with Server-Sent Events
@@ -667,39 +937,52 @@ async def chat_with_agent_stream(
     Raises:
         HTTPException: 404 if agent not found, 504 if timeout, 500 for other errors
     """
-    logger.info(f"Streaming chat request for agent '{agent_id}' (file={file is not None}, session={session_id})")
+    agent_manager = services.agent_manager
+    ai_service = services.ai_service
+    rag_service = services.rag_service
+    
+    logger.info(
+        "Streaming chat request for agent '%s' (file=%s, session=%s)",
+        agent_id, file is not None, session_id
+    )
+    
+    start_ns = time.perf_counter_ns()
+    chat_timeout = settings.chat_timeout
+    deadline = time.monotonic() + chat_timeout
     
-    start_time = time.time()
+    # Reject unknown or disabled agents with a single lookup, before any work
+    agent = agent_manager.find_enabled(agent_id)
+    if agent is None:
+        raise _agent_not_found(agent_manager, agent_id)
     
     try:
-        # Validate agent exists and is enabled
-        agent = agent_manager.get_agent(agent_id)
+        # Validate and read the upload before streaming starts: FastAPI closes
+        # uploaded files once the endpoint returns, before the generator runs
+        file_bytes = None
+        if file is not None:
+            validate_file(file)
+            file_bytes = await read_upload(file)
         
         async def event_generator():
             """Generate SSE events for streaming response."""
             try:
                 # CASE 1: File Upload - Process and send acknowledgment
                 if file is not None:
-                    logger.info(f"Processing file upload in streaming mode: {file.filename}")
-                    
-                    # Validate file type
-                    validate_file(file)
+                    logger.info("Processing file upload in streaming mode: %s", file.filename)
                     
-                    # Read file content
-                    file_bytes = await file.read()
                     file_size = len(file_bytes)
                     
                     # Validate file size
                     if file_size > MAX_FILE_SIZE:
-                        yield f"data: {json.dumps({'error': 'File too large', 'code': 413})}\n\n"
+                        yield _sse({'error': 'File too large', 'code': 413})
                         return
                     
                     if file_size == 0:
-                        yield f"data: {json.dumps({'error': 'File is empty', 'code': 400})}\n\n"
+                        yield _sse({'error': 'File is empty', 'code': 400})
                         return
                     
                     # Send processing status
-                    yield f"data: {json.dumps({'status': 'processing', 'message': 'Processing your document...'})}\n\n"
+                    yield _sse({'status': 'processing', 'message': 'Processing your document...'})
                     
                     # Process based on file type
                     if file.content_type in ALLOWED_PDF_TYPES:
@@ -719,76 +1002,81 @@ async def chat_with_agent_stream(
                     else:
                         ack_message = "I've processed your image. I can help you understand what's in it. What would you like to know?"
                     
-                    # Stream the acknowledgment
-                    for word in ack_message.split():
-                        yield f"data: {json.dumps({'chunk': word + ' '})}\n\n"
-                        await asyncio.sleep(0.02)  # Small delay for streaming effect
+                    # The acknowledgment is already complete, so send it as one chunk
+                    yield _sse_chunk(ack_message)
                     
                     # Send completion
-                    processing_time_ms = int((time.time() - start_time) * 1000)
-                    yield f"data: {json.dumps({'done': True, 'session_id': new_session_id, 'mode': 'document', 'message_type': 'file_ack', 'metadata': {'processing_time_ms': processing_time_ms}})}\n\n"
+                    processing_time_ms = _elapsed_ms(start_ns)
+                    yield _sse({'done': True, 'session_id': new_session_id, 'mode': 'document', 'message_type': 'file_ack', 'metadata': {'processing_time_ms': processing_time_ms}})
                     
-                    logger.info(f"File processed successfully in streaming mode: session={new_session_id}")
+                    logger.info("File processed successfully in streaming mode: session=%s", new_session_id)
                 
                 # CASE 2: Query with Session Context
                 elif session_id is not None:
-                    logger.info(f"Processing streaming query with session: {session_id}")
+                    logger.info("Processing streaming query with session: %s", session_id)
                     
                     # Validate session exists
                     session = rag_service.session_manager.get_session(session_id)
                     if session is None:
-                        yield f"data: {json.dumps({'error': 'Session not found or expired', 'code': 404})}\n\n"
+                        yield _sse({'error': 'Session not found or expired', 'code': 404})
                         return
                     
-                    # Always try RAG first - it will intelligently determine if query is about document
-                    result = await rag_service.query_session(session_id, message, top_k=5)
+                    # Try RAG unless the query clearly has nothing to do with the document,
+                    # forwarding the answer as it is generated
+                    result = None
+                    streamed = False
+                    if await rag_service.is_probably_document_query(session_id, message):
+                        async for chunk, result in rag_service.query_session_stream(session_id, message, top_k=5):
+                            if chunk is not None:
+                                streamed = True
+                                yield _sse_chunk(chunk)
+                    else:
+                        logger.info("Query is unrelated to the document, skipping retrieval")
                     
                     # Check if RAG determined this is a general query
-                    if result["reply"] is None or result["metadata"].get("fallback_to_general"):
+                    if result is None or result["reply"] is None or result["metadata"].get("fallback_to_general"):
                         # Fallback to general streaming
                         logger.info("RAG detected general query, using agent streaming mode")
-                        async for chunk in ai_service.generate_response_stream(agent_id, message):
-                            yield f"data: {json.dumps({'chunk': chunk})}\n\n"
+                        if streamed:
+                            # The verdict came after part of the document reply was sent
+                            yield RESET_FRAME
+                        async for chunk in ai_service.generate_response_stream(agent_id, message, use_cache=not nocache):
+                            yield _sse_chunk(chunk)
                         
                         # Send completion
-                        processing_time_ms = int((time.time() - start_time) * 1000)
-                        yield f"data: {json.dumps({'done': True, 'session_id': session_id, 'mode': 'general', 'message_type': 'text', 'metadata': {'processing_time_ms': processing_time_ms, 'fallback_reason': 'general_knowledge_query'}})}\n\n"
+                        processing_time_ms = _elapsed_ms(start_ns)
+                        yield _sse({'done': True, 'session_id': session_id, 'mode': 'general', 'message_type': 'text', 'metadata': {'processing_time_ms': processing_time_ms, 'fallback_reason': 'general_knowledge_query'}})
                     else:
-                        # Stream the document-based response
-                        for word in result["reply"].split():
-                            yield f"data: {json.dumps({'chunk': word + ' '})}\n\n"
-                            await asyncio.sleep(0.02)
-                        
                         # Send completion
-                        processing_time_ms = int((time.time() - start_time) * 1000)
-                        yield f"data: {json.dumps({'done': True, 'session_id': session_id, 'mode': 'document', 'message_type': 'answer', 'metadata': {'processing_time_ms': processing_time_ms, 'chunks_retrieved': result['metadata'].get('chunks_retrieved', 0)}})}\n\n"
+                        processing_time_ms = _elapsed_ms(start_ns)
+                        yield _sse({'done': True, 'session_id': session_id, 'mode': 'document', 'message_type': 'answer', 'source_chunks': result['source_chunks'], 'metadata': {'processing_time_ms': processing_time_ms, 'chunks_retrieved': result['metadata'].get('chunks_retrieved', 0)}})
                 
                 # CASE 3: Standard Streaming Chat
                 else:
                     # Stream chunks from AI service
-                    async for chunk in ai_service.generate_response_stream(agent_id, message):
-                        yield f"data: {json.dumps({'chunk': chunk})}\n\n"
+                    async for chunk in ai_service.generate_response_stream(agent_id, message, use_cache=not nocache):
+                        yield _sse_chunk(chunk)
                     
                     # Calculate processing time
-                    processing_time_ms = int((time.time() - start_time) * 1000)
+                    processing_time_ms = _elapsed_ms(start_ns)
                     
                     # Send completion event
-                    yield f"data: {json.dumps({'done': True, 'mode': 'general', 'message_type': 'text', 'metadata': {'processing_time_ms': processing_time_ms}})}\n\n"
+                    yield _sse({'done': True, 'mode': 'general', 'message_type': 'text', 'metadata': {'processing_time_ms': processing_time_ms}})
                     
-                    logger.info(f"Successfully completed streaming response for agent '{agent_id}' in {processing_time_ms}ms")
+                    logger.info("Successfully completed streaming response for agent '%s' in %dms", agent_id, processing_time_ms)
                 
             except asyncio.TimeoutError as e:
                 # Send timeout error
-                yield f"data: {json.dumps({'error': str(e), 'code': 504})}\n\n"
-                logger.warning(f"Request timeout for agent '{agent_id}': {e}")
+                yield _sse({'error': str(e), 'code': 504})
+                logger.warning("Request timeout for agent '%s': %s", agent_id, e)
                 
             except Exception as e:
                 # Send error event
-                yield f"data: {json.dumps({'error': 'AI service temporarily unavailable', 'code': 500})}\n\n"
-                logger.error(f"Error in streaming response for agent '{agent_id}': {e}", exc_info=True)
+                yield _sse({'error': 'AI service temporarily unavailable', 'code': 500})
+                logger.error("Error in streaming response for agent '%s': %s", agent_id, e, exc_info=True)
         
         return StreamingResponse(
-            event_generator(),
+            _stream_within(event_generator(), deadline, chat_timeout),
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
@@ -797,18 +1085,12 @@ async def chat_with_agent_stream(
             }
         )
     
-    except KeyError as e:
-        # Agent not found or disabled
-        logger.warning(f"Agent not found: {e}")
-        available_agents = ", ".join(agent_manager.list_agent_ids())
-        raise HTTPException(
-            status_code=404,
-            detail=f"Agent '{agent_id}' not found. Available agents: {available_agents}"
-        )
+    except HTTPException:
+        raise
     
     except Exception as e:
         # Other errors
-        logger.error(f"Error setting up streaming for agent '{agent_id}': {e}", exc_info=True)
+        logger.error("Error setting up streaming for agent '%s': %s", agent_id, e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail="AI service temporarily unavailable. Please try again later."
@@ -4,8 +4,11 @@ Loads and validates environment-based configuration.
 """
 from pydantic_settings import BaseSettings
 from pydantic import Field, validator
+from functools import lru_cache
 from typing import List
 import logging
+import threading
+import time
 
 
 class Settings(BaseSettings):
@@ -22,6 +25,12 @@ class Settings(BaseSettings):
         le=60,
         description="Maximum timeout for AI generation requests in seconds"
     )
+    chat_timeout: int = Field(
+        default=60,
+        ge=5,
+        le=300,
+        description="End-to-end deadline for a chat request in seconds, including uploads and fallbacks"
+    )
     max_message_length: int = Field(
         default=5000,
         ge=1,
@@ -52,6 +61,12 @@ class Settings(BaseSettings):
         default="INFO",
         description="Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)"
     )
+    log_traceback_interval: int = Field(
+        default=60,
+        ge=0,
+        le=3600,
+        description="Seconds before a repeated error of the same type logs its traceback again (0 logs every traceback)"
+    )
     
     # Rate Limiting Settings
     rate_limit_enabled: bool = Field(
@@ -71,6 +86,32 @@ class Settings(BaseSettings):
         description="Maximum total requests per minute (global)"
     )
     
+    # Compression Settings
+    gzip_enabled: bool = Field(
+        default=False,
+        description="Gzip-compress responses for clients that accept it (SSE streams are not compressed)"
+    )
+    
+    # Response Cache Settings
+    response_cache_size: int = Field(
+        default=10000,
+        ge=0,
+        le=1000000,
+        description="Maximum cached replies to repeated general questions (0 disables the cache)"
+    )
+    response_cache_ttl: int = Field(
+        default=3600,
+        ge=1,
+        le=86400,
+        description="Seconds a cached reply stays valid"
+    )
+    
+    # Startup Settings
+    warmup_llm: bool = Field(
+        default=False,
+        description="Send a one-token Gemini request on startup to open the API connection (billed)"
+    )
+    
     # Application Metadata
     app_name: str = Field(
         default="Multi-Agent Learning Chat API",
@@ -103,14 +144,67 @@ class Settings(BaseSettings):
         case_sensitive = False
 
 
+@lru_cache()
 def get_settings() -> Settings:
     """
     Get application settings instance.
-    This function can be used as a dependency in FastAPI.
+    This function can be used as a dependency in FastAPI; the instance is
+    cached so per-request dependencies do not re-read the environment.
     """
     return Settings()
 
 
+class TracebackRateLimitFilter(logging.Filter):
+    """Log filter that drops repeated tracebacks for the same error.
+    
+    The first record from a logger carrying a given exception type keeps its
+    traceback. Later ones within ``interval`` seconds are logged with their
+    message only, so an upstream outage that fails every request does not
+    spend CPU formatting the same traceback over and over.
+    """
+    
+    def __init__(self, interval: float = 60):
+        """Initialize the filter.
+        
+        Args:
+            interval: Seconds before the same error logs its traceback again
+        """
+        super().__init__()
+        self.interval = interval
+        self._last_traceback: dict[tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Strip the traceback from a record if one was logged recently.
+        
+        Args:
+            record: Log record being handled
+        
+        Returns:
+            Always True; records are never dropped
+        """
+        if not record.exc_info or record.exc_info[0] is None:
+            return True
+        if getattr(record, "_traceback_checked", False):
+            # Already decided by an earlier handler sharing this filter
+            return True
+        record._traceback_checked = True
+        
+        key = (record.name, record.exc_info[0].__name__)
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_traceback.get(key)
+            if last is None or now - last >= self.interval:
+                self._last_traceback[key] = now
+                return True
+        
+        record.msg = f"{record.getMessage()} (traceback suppressed, repeated within {self.interval}s)"
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        return True
+
+
 def configure_logging(settings: Settings) -> None:
     """Configure application logging based on settings."""
     logging.basicConfig(
@@ -118,3 +212,8 @@ def configure_logging(settings: Settings) -> None:
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
+    
+    if settings.log_traceback_interval > 0:
+        traceback_filter = TracebackRateLimitFilter(settings.log_traceback_interval)
+        for handler in logging.getLogger().handlers:
+            handler.addFilter(traceback_filter)
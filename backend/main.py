@@ -4,6 +4,8 @@ Multi-Agent Learning Chat API - Main Application
 This is the main FastAPI application file that initializes and configures
 the AI-powered educational chat system with modular architecture.
 """
+import asyncio
+import time
 import warnings
 import logging
 from contextlib import asynccontextmanager
@@ -12,18 +14,21 @@ from contextlib import asynccontextmanager
 warnings.filterwarnings("ignore", category=UserWarning, module="google.rpc")
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
-from backend.config import Settings, configure_logging
-from backend.agents.config import AgentManager, AGENTS
+from backend.config import configure_logging, get_settings
+from backend.agents.config import get_default_manager
 from backend.services.ai_service import AIService
 from backend.services.document_processor import DocumentProcessor
 from backend.services.embedding_service import EmbeddingService
 from backend.services.session_manager import SessionManager
 from backend.services.rag_service import RAGService
 from backend.api.v1 import agents, health, documents
-from backend.api.exceptions import register_exception_handlers
+from backend.api.exceptions import register_exception_handlers, warmup_exception_handlers
 from backend.middleware.logging import LoggingMiddleware
 from backend.middleware.rate_limit import RateLimitMiddleware
+from backend.middleware.body_limit import BodySizeLimitMiddleware
+from backend.middleware.compression import StreamAwareGZipMiddleware
 
 # Initialize logger (will be configured after settings are loaded)
 logger = logging.getLogger(__name__)
@@ -54,6 +59,7 @@ async def lifespan(app: FastAPI):
         logger.info(f"  - Request Timeout: {settings.request_timeout}s")
         logger.info(f"  - Max Message Length: {settings.max_message_length}")
         logger.info(f"  - Log Level: {settings.log_level}")
+        logger.info(f"  - Event Loop: {type(asyncio.get_running_loop()).__module__}")
         logger.info(f"  - CORS Origins: {settings.cors_origins}")
         logger.info(f"  - Rate Limiting: {'Enabled' if settings.rate_limit_enabled else 'Disabled'}")
         if settings.rate_limit_enabled:
@@ -67,6 +73,18 @@ async def lifespan(app: FastAPI):
         for agent in agent_manager.list_agents():
             logger.info(f"  - {agent['id']}: {agent['name']}")
         
+        # Pay one-off cold costs (first error response, embedding kernels,
+        # Gemini connection setup) before serving traffic
+        warmup_start = time.perf_counter()
+        warmups = [
+            warmup_exception_handlers(app),
+            app.state.rag_service.embedding_service.warmup()
+        ]
+        if settings.warmup_llm:
+            warmups.append(app.state.ai_service.warmup())
+        await asyncio.gather(*warmups)
+        logger.info(f"Services warmed up in {(time.perf_counter() - warmup_start) * 1000:.0f}ms")
+        
         # Validate AI service
         logger.info("AI Service initialized successfully")
         logger.info(f"  - Gemini API configured: ✓")
@@ -94,6 +112,13 @@ async def lifespan(app: FastAPI):
     if hasattr(app.state, 'session_manager'):
         await app.state.session_manager.stop()
         logger.info("RAG Session Manager stopped")
+    
+    # Release service worker threads instead of waiting for garbage collection
+    if hasattr(app.state, 'ai_service'):
+        app.state.ai_service.close()
+    if hasattr(app.state, 'rag_service'):
+        app.state.rag_service.embedding_service.close()
+    logger.info("Service executors shut down")
 
 
 def create_app() -> FastAPI:
@@ -103,8 +128,9 @@ def create_app() -> FastAPI:
     Returns:
         Configured FastAPI application instance
     """
-    # Load settings
-    settings = Settings()
+    # Load settings from the same cached instance the route dependencies
+    # resolve, so app.state.settings and Depends(get_settings) always agree
+    settings = get_settings()
     
     # Configure logging based on settings
     configure_logging(settings)
@@ -114,6 +140,7 @@ def create_app() -> FastAPI:
         title=settings.app_name,
         version=settings.app_version,
         description="Production-grade AI-powered educational chat system with subject-specific agents",
+        default_response_class=ORJSONResponse,
         lifespan=lifespan
     )
     
@@ -121,7 +148,7 @@ def create_app() -> FastAPI:
     app.state.settings = settings
     
     # Initialize services
-    agent_manager = AgentManager(AGENTS)
+    agent_manager = get_default_manager()
     ai_service = AIService(settings, agent_manager)
     
     # Initialize RAG services
@@ -140,6 +167,11 @@ def create_app() -> FastAPI:
     agents.set_services(agent_manager, ai_service, rag_service)  # Added rag_service
     documents.set_rag_service(rag_service)
     
+    # Reject oversized uploads from their Content-Length before reading the body.
+    # Added before CORS so CORSMiddleware wraps it and its 413 carries CORS
+    # headers (rate limiting and logging still wrap both)
+    app.add_middleware(BodySizeLimitMiddleware)
+    
     # Configure CORS with environment-based origins
     app.add_middleware(
         CORSMiddleware,
@@ -158,6 +190,10 @@ def create_app() -> FastAPI:
             window_size=60
         )
     
+    # Compress JSON responses; SSE streams pass through so frames are not held back
+    if settings.gzip_enabled:
+        app.add_middleware(StreamAwareGZipMiddleware, minimum_size=500, compresslevel=6)
+    
     # Add logging middleware
     app.add_middleware(LoggingMiddleware)
     
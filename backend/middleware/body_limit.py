@@ -0,0 +1,93 @@
+"""
+Request body size limiting middleware.
+
+Rejects requests whose declared Content-Length exceeds the upload limit
+before any of the body is received, so oversized uploads are not buffered
+or spooled to disk only to be rejected by the endpoint afterwards.
+"""
+
+import logging
+from fastapi import Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from backend.api.exceptions import HTTP_SUGGESTIONS, build_error_bytes
+
+logger = logging.getLogger(__name__)
+
+# Upload limit reported to clients, matching the endpoints' own check
+MAX_FILE_SIZE = 30 * 1024 * 1024  # 30 MB
+
+# Extra body allowance for form fields and multipart framing; not reported
+MULTIPART_HEADROOM = 1024 * 1024
+
+
+class BodySizeLimitMiddleware(BaseHTTPMiddleware):
+    """Middleware that returns 413 for requests declaring an oversized body.
+    
+    Only the Content-Length header is inspected. Requests without it (or with
+    an unparsable value) are passed through, and the endpoints' own size
+    checks still apply to the bytes actually read.
+    """
+    
+    def __init__(self, app, max_file_size: int = MAX_FILE_SIZE):
+        """Initialize the limiter.
+        
+        Args:
+            app: FastAPI application instance
+            max_file_size: Largest accepted upload in bytes; the body may
+                exceed it by MULTIPART_HEADROOM
+        """
+        super().__init__(app)
+        self.max_file_size = max_file_size
+        self.max_body_size = max_file_size + MULTIPART_HEADROOM
+    
+    async def dispatch(self, request: Request, call_next):
+        """Reject the request early if its declared body is too large.
+        
+        Args:
+            request: Incoming HTTP request
+            call_next: Next middleware/handler in chain
+        
+        Returns:
+            Response or 413 error if the body exceeds the limit
+        """
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_body_size:
+            logger.warning(
+                "Rejected %s %s: Content-Length %s exceeds %d bytes",
+                request.method, request.url.path, content_length, self.max_body_size
+            )
+            return self._too_large_response(request, int(content_length))
+        
+        return await call_next(request)
+    
+    def _too_large_response(self, request: Request, content_length: int) -> Response:
+        """Create a 413 payload too large error response.
+        
+        The body has the same shape as the errors built by the application's
+        exception handlers, including details and a suggestion.
+        
+        Args:
+            request: The rejected request
+            content_length: Declared request body size in bytes
+        
+        Returns:
+            Response with 413 status
+        """
+        body = build_error_bytes(
+            code=413,
+            message=f"Request too large: {content_length / 1024 / 1024:.1f} MB. "
+                    f"Maximum allowed: {self.max_file_size / 1024 / 1024:.0f} MB. "
+                    "Compress the file or reduce its size before uploading.",
+            details={
+                "endpoint": request.url.path,
+                "method": request.method
+            },
+            suggestion=HTTP_SUGGESTIONS[413]
+        )
+        return Response(
+            content=body,
+            status_code=413,
+            media_type="application/json",
+            headers={"Connection": "close"}
+        )
@@ -0,0 +1,52 @@
+"""
+Response compression middleware.
+
+Wraps Starlette's GZipMiddleware so Server-Sent Events streams are never
+compressed. Gzip buffers its output until enough data has accumulated, which
+would hold back SSE frames that must reach the client as they are produced.
+"""
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+# Response content types that are passed through uncompressed
+EXCLUDED_CONTENT_TYPES = ("text/event-stream",)
+
+
+class _StreamAwareGZipResponder(GZipResponder):
+    """GZipResponder that leaves excluded content types untouched."""
+    
+    async def send_with_gzip(self, message: Message) -> None:
+        """Send a response message, compressing it unless it is excluded.
+        
+        Args:
+            message: ASGI response message
+        """
+        await super().send_with_gzip(message)
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            if content_type.startswith(EXCLUDED_CONTENT_TYPES):
+                # Starlette forwards responses that already carry an encoding
+                # as-is; reuse that path for streams that must not be buffered
+                self.content_encoding_set = True
+
+
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that does not compress Server-Sent Events responses."""
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Compress the response for clients that accept gzip.
+        
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive callable
+            send: ASGI send callable
+        """
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = _StreamAwareGZipResponder(
+                self.app, self.minimum_size, compresslevel=self.compresslevel
+            )
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -39,7 +39,7 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             Response from the application
         """
         # Record start time for performance tracking
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Extract request details
         method = request.method
@@ -58,7 +58,7 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             
         except Exception as exc:
             # Log error details (Requirement 9.3)
-            processing_time = time.time() - start_time
+            processing_time = time.perf_counter() - start_time
             logger.error(
                 f"Request failed | method={method} path={path} "
                 f"error={str(exc)} duration={processing_time:.3f}s",
@@ -67,7 +67,7 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             raise
         
         # Calculate processing time (Requirement 9.5)
-        processing_time = time.time() - start_time
+        processing_time = time.perf_counter() - start_time
         
         # Log response with performance metrics (Requirement 9.2)
         log_message = (
@@ -102,7 +102,7 @@ async def logging_middleware_function(request: Request, call_next: Callable) ->
         Response from the application
     """
     # Record start time for performance tracking
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     # Extract request details
     method = request.method
@@ -121,7 +121,7 @@ async def logging_middleware_function(request: Request, call_next: Callable) ->
         
     except Exception as exc:
         # Log error details (Requirement 9.3)
-        processing_time = time.time() - start_time
+        processing_time = time.perf_counter() - start_time
         logger.error(
             f"Request failed | method={method} path={path} "
             f"error={str(exc)} duration={processing_time:.3f}s",
@@ -130,7 +130,7 @@ async def logging_middleware_function(request: Request, call_next: Callable) ->
         raise
     
     # Calculate processing time (Requirement 9.5)
-    processing_time = time.time() - start_time
+    processing_time = time.perf_counter() - start_time
     
     # Log response with performance metrics (Requirement 9.2)
     log_message = (
@@ -12,7 +12,7 @@ from collections import defaultdict
 from typing import Dict
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 logger = logging.getLogger(__name__)
 
@@ -255,7 +255,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             f"{len(self._global_requests)} global requests in window"
         )
     
-    def _rate_limit_response(self, message: str, retry_after: int) -> JSONResponse:
+    def _rate_limit_response(self, message: str, retry_after: int) -> ORJSONResponse:
         """Create a 429 rate limit error response.
         
         Args:
@@ -263,9 +263,9 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             retry_after: Seconds until retry
         
         Returns:
-            JSONResponse with 429 status
+            ORJSONResponse with 429 status
         """
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=429,
             content={
                 "success": False,
@@ -21,6 +21,8 @@ class ErrorDetail(BaseModel):
     )
     
     class Config:
+        frozen = True
+        extra = "forbid"
         json_schema_extra = {
             "example": {
                 "code": 404,
@@ -42,6 +44,8 @@ class ErrorResponse(BaseModel):
     error: ErrorDetail = Field(..., description="Error details")
     
     class Config:
+        frozen = True
+        extra = "forbid"
         json_schema_extra = {
             "example": {
                 "success": False,
@@ -8,6 +8,9 @@ formatting.
 
 import asyncio
 import logging
+import threading
+import time
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 import google.generativeai as genai
@@ -26,6 +29,7 @@ class AIService:
     - Timeout protection for AI generation requests
     - Prompt construction with agent-specific system prompts
     - Response cleaning and formatting
+    - Caching replies to repeated questions
     """
     
     def __init__(self, settings: Settings, agent_manager: AgentManager):
@@ -63,6 +67,9 @@ class AIService:
             }
         )
         
+        # LRU of (agent_id, normalized message) -> (expires_at, reply)
+        self._response_cache: OrderedDict[tuple[str, str], tuple[float, str]] = OrderedDict()
+        
         logger.info(
             f"AIService initialized with Gemini API "
             f"(workers={settings.thread_pool_workers}, "
@@ -72,24 +79,51 @@ class AIService:
     def __del__(self):
         """Cleanup executor on service destruction."""
         if hasattr(self, 'executor'):
-            self.executor.shutdown(wait=False)
-            logger.debug("AIService executor shutdown")
+            self.close()
+    
+    def close(self) -> None:
+        """Release the worker threads used for Gemini API calls.
+        
+        Called from the application shutdown hook. The Gemini models and
+        their API connection are created once and shared for the lifetime
+        of the service, so only the executor needs releasing.
+        """
+        self.executor.shutdown(wait=False)
+        logger.debug("AIService executor shutdown")
+
+    async def warmup(self) -> None:
+        """Open the Gemini API connection with a one-token request.
+        
+        Failures are logged and ignored so that a slow or unreachable API at
+        startup does not prevent the application from serving.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.wait_for(
+                loop.run_in_executor(self.executor, self._sync_ping),
+                timeout=self.settings.request_timeout
+            )
+        except Exception as e:
+            logger.warning(f"Gemini warmup failed: {e}")
 
     async def generate_response(
         self,
         agent_id: str,
         message: str,
-        timeout: Optional[int] = None
+        timeout: Optional[int] = None,
+        use_cache: bool = True
     ) -> str:
         """Generate an AI response asynchronously with timeout protection.
         
         This method wraps the synchronous Gemini API call in an executor to make it
-        async, and applies timeout protection to prevent hanging requests.
+        async, and applies timeout protection to prevent hanging requests. Replies
+        to a question the agent answered recently are served from the cache.
         
         Args:
             agent_id: The ID of the agent to use for response generation
             message: The user's message/question
             timeout: Optional timeout in seconds (uses settings default if not provided)
+            use_cache: Whether a cached reply may be returned
         
         Returns:
             The cleaned AI response text
@@ -103,6 +137,13 @@ class AIService:
         if timeout is None:
             timeout = self.settings.request_timeout
         
+        cache_key = self._cache_key(agent_id, message)
+        if use_cache:
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                logger.info(f"Serving cached response for agent '{agent_id}'")
+                return cached
+        
         logger.info(f"Generating response for agent '{agent_id}' with timeout {timeout}s")
         
         try:
@@ -115,6 +156,7 @@ class AIService:
                 )
             
             logger.info(f"Successfully generated response for agent '{agent_id}'")
+            self._cache_response(cache_key, response)
             return response
             
         except asyncio.TimeoutError:
@@ -142,17 +184,20 @@ class AIService:
         self,
         agent_id: str,
         message: str,
-        timeout: Optional[int] = None
+        timeout: Optional[int] = None,
+        use_cache: bool = True
     ):
         """Generate an AI response with streaming support.
         
         This method streams tokens as they're generated, providing immediate feedback
-        to users and significantly improving perceived response time.
+        to users and significantly improving perceived response time. A cached reply
+        is sent as a single chunk, and a completed stream is cached for later calls.
         
         Args:
             agent_id: The ID of the agent to use for response generation
             message: The user's message/question
             timeout: Optional timeout in seconds (uses settings default if not provided)
+            use_cache: Whether a cached reply may be returned
         
         Yields:
             Chunks of the AI response as they're generated
@@ -165,14 +210,25 @@ class AIService:
         if timeout is None:
             timeout = self.settings.request_timeout
         
+        cache_key = self._cache_key(agent_id, message)
+        if use_cache:
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                logger.info(f"Serving cached streaming response for agent '{agent_id}'")
+                yield cached
+                return
+        
         logger.info(f"Generating streaming response for agent '{agent_id}' with timeout {timeout}s")
         
         try:
+            chunks = []
             async with self.semaphore:
                 async for chunk in self._generate_response_stream_async(agent_id, message, timeout):
+                    chunks.append(chunk)
                     yield chunk
             
             logger.info(f"Successfully completed streaming response for agent '{agent_id}'")
+            self._cache_response(cache_key, self._clean_response("".join(chunks)))
             
         except asyncio.TimeoutError:
             logger.warning(f"Request timeout for agent '{agent_id}' after {timeout}s")
@@ -229,7 +285,8 @@ class AIService:
             timeout: Timeout in seconds
         
         Yields:
-            Chunks of the AI response
+            Chunks of the AI response; chunks that arrive while the consumer is
+            busy are merged into one
         
         Raises:
             KeyError: If the agent is not found
@@ -243,6 +300,9 @@ class AIService:
         # Create a queue for streaming chunks
         queue = asyncio.Queue()
         
+        # Tells the worker thread to stop reading once the consumer is gone
+        stop = threading.Event()
+        
         # Run streaming in executor
         async def stream_worker():
             try:
@@ -251,7 +311,8 @@ class AIService:
                     self._sync_generate_stream,
                     prompt,
                     queue,
-                    loop  # Pass the event loop to the thread
+                    loop,  # Pass the event loop to the thread
+                    stop
                 )
             except Exception as e:
                 await queue.put(("error", e))
@@ -264,33 +325,47 @@ class AIService:
         try:
             # Stream chunks with timeout
             start_time = loop.time()
+            deferred = None
             
             while True:
-                # Check timeout
-                elapsed = loop.time() - start_time
-                if elapsed > timeout:
-                    task.cancel()
-                    raise asyncio.TimeoutError()
-                
-                # Get next chunk with remaining timeout
-                remaining_timeout = timeout - elapsed
-                try:
-                    msg_type, data = await asyncio.wait_for(
-                        queue.get(),
-                        timeout=remaining_timeout
-                    )
-                except asyncio.TimeoutError:
-                    task.cancel()
-                    raise
+                if deferred is not None:
+                    msg_type, data = deferred
+                    deferred = None
+                else:
+                    # Check timeout
+                    elapsed = loop.time() - start_time
+                    if elapsed > timeout:
+                        task.cancel()
+                        raise asyncio.TimeoutError()
+                    
+                    # Get next chunk with remaining timeout
+                    remaining_timeout = timeout - elapsed
+                    try:
+                        msg_type, data = await asyncio.wait_for(
+                            queue.get(),
+                            timeout=remaining_timeout
+                        )
+                    except asyncio.TimeoutError:
+                        task.cancel()
+                        raise
                 
                 if msg_type == "done":
                     break
                 elif msg_type == "error":
                     raise data
                 elif msg_type == "chunk":
-                    yield data
+                    # Merge chunks that queued up while the previous one was being sent
+                    parts = [data]
+                    while not queue.empty():
+                        item = queue.get_nowait()
+                        if item[0] != "chunk":
+                            deferred = item
+                            break
+                        parts.append(item[1])
+                    yield "".join(parts)
                     
         finally:
+            stop.set()
             if not task.done():
                 task.cancel()
     
@@ -321,15 +396,25 @@ class AIService:
         
         return cleaned_response
 
-    def _sync_generate_stream(self, prompt: str, queue, loop):
+    def _sync_ping(self) -> None:
+        """Synchronous one-token Gemini request (runs in executor)."""
+        self.model.generate_content(
+            "ping",
+            generation_config={'max_output_tokens': 1}
+        )
+
+    def _sync_generate_stream(self, prompt: str, queue, loop, stop: threading.Event):
         """Synchronous method that streams from Gemini API.
         
         This method is executed in a thread pool and puts chunks into a queue.
+        Chunks are handed to the event loop without waiting for it, so the
+        thread keeps reading from the API while the client is being written to.
         
         Args:
             prompt: The complete prompt
             queue: Async queue to put chunks into
             loop: The event loop to use for thread-safe queue operations
+            stop: Set when the consumer has gone; the API stream is abandoned
         """
         try:
             # Call Gemini API with streaming
@@ -337,20 +422,66 @@ class AIService:
             
             # Stream chunks
             for chunk in response:
+                if stop.is_set():
+                    break
                 if chunk.text:
                     # Put chunk in queue (thread-safe)
-                    asyncio.run_coroutine_threadsafe(
-                        queue.put(("chunk", chunk.text)),
-                        loop
-                    ).result()
+                    loop.call_soon_threadsafe(queue.put_nowait, ("chunk", chunk.text))
                     
         except Exception as e:
             # Put error in queue
-            asyncio.run_coroutine_threadsafe(
-                queue.put(("error", e)),
-                loop
-            ).result()
+            loop.call_soon_threadsafe(queue.put_nowait, ("error", e))
 
+    @staticmethod
+    def _cache_key(agent_id: str, message: str) -> tuple[str, str]:
+        """Build a response cache key that ignores case and spacing differences.
+        
+        Args:
+            agent_id: The ID of the agent
+            message: The user's message
+        
+        Returns:
+            Tuple of agent ID and normalized message
+        """
+        return agent_id, " ".join(message.lower().split())
+    
+    def _get_cached_response(self, key: tuple[str, str]) -> Optional[str]:
+        """Look up an unexpired cached reply.
+        
+        Args:
+            key: Cache key from _cache_key
+        
+        Returns:
+            The cached reply, or None if absent or expired
+        """
+        entry = self._response_cache.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, reply = entry
+        if expires_at < time.monotonic():
+            del self._response_cache[key]
+            return None
+        
+        self._response_cache.move_to_end(key)
+        return reply
+    
+    def _cache_response(self, key: tuple[str, str], reply: str) -> None:
+        """Store a reply, evicting the least recently used entry when full.
+        
+        Args:
+            key: Cache key from _cache_key
+            reply: The cleaned AI response
+        """
+        max_size = self.settings.response_cache_size
+        if not reply or max_size <= 0:
+            return
+        
+        self._response_cache[key] = (time.monotonic() + self.settings.response_cache_ttl, reply)
+        self._response_cache.move_to_end(key)
+        if len(self._response_cache) > max_size:
+            self._response_cache.popitem(last=False)
+    
     def _build_prompt(self, agent_id: str, message: str) -> str:
         """Construct a prompt by combining agent system prompt with user message.
         
@@ -367,11 +498,11 @@ class AIService:
         Raises:
             KeyError: If the agent is not found or disabled
         """
-        # Get the agent configuration
-        agent = self.agent_manager.get_agent(agent_id)
+        # Get the agent's system prompt
+        system_prompt = self.agent_manager.get_prompt(agent_id)
         
         # Combine system prompt with user message
-        prompt = f"{agent.system_prompt}\n\nUser Question: {message}"
+        prompt = f"{system_prompt}\n\nUser Question: {message}"
         
         logger.debug(f"Built prompt for agent '{agent_id}' (length: {len(prompt)} chars)")
         
@@ -40,7 +40,11 @@ class EmbeddingService:
     def __del__(self):
         """Cleanup executor on service destruction."""
         if hasattr(self, 'executor'):
-            self.executor.shutdown(wait=False)
+            self.close()
+    
+    def close(self) -> None:
+        """Release the worker threads used for embedding generation."""
+        self.executor.shutdown(wait=False)
     
     async def embed_texts(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for a list of texts asynchronously.
@@ -89,6 +93,10 @@ class EmbeddingService:
         embeddings = await self.embed_texts([text])
         return embeddings[0]
     
+    async def warmup(self) -> None:
+        """Run one embedding so the first document upload skips kernel setup."""
+        await self.embed_text("warmup")
+    
     def _sync_embed(self, texts: List[str]) -> List[List[float]]:
         """Synchronous embedding generation (runs in executor).
         
@@ -5,8 +5,11 @@ Orchestrates document processing, embedding, retrieval, and generation.
 
 import asyncio
 import logging
-from typing import List, Dict, Any, Tuple
+import re
+import threading
+from typing import AsyncIterator, Iterable, List, Dict, Any, Optional, Tuple
 import google.generativeai as genai
+import numpy as np
 
 from backend.services.document_processor import DocumentProcessor, DocumentChunk
 from backend.services.embedding_service import EmbeddingService
@@ -16,6 +19,129 @@ from backend.config import Settings
 
 logger = logging.getLogger(__name__)
 
+_WORD_PATTERN = re.compile(r"\w{2,}")
+
+GENERAL_QUERY_MARKER = "GENERAL_QUERY"
+NO_RELEVANT_CONTENT_REPLY = "I couldn't find relevant information in the document to answer your question."
+
+# Streamed RAG replies are held back until this many characters have arrived,
+# so a reply that is only a GENERAL_QUERY verdict is never forwarded to the client
+GENERAL_QUERY_LOOKAHEAD = 64
+
+# Queries below this cosine similarity to a document's centroid embedding,
+# and sharing no terms with it, are answered without retrieval. Kept low so
+# only clearly unrelated questions skip the document
+DOCUMENT_SIMILARITY_THRESHOLD = 0.15
+
+# Inflection suffixes stripped before query and document words are compared,
+# with their replacements, in the order they are tried
+_SUFFIXES = (("ies", "y"), ("ing", ""), ("ed", ""), ("es", ""), ("s", ""))
+
+# Maximum vision model calls in flight while describing one PDF's images
+VISION_CONCURRENCY = 4
+
+# Common words that say nothing about whether a query concerns the document
+STOPWORDS = frozenset({
+    "about", "all", "also", "am", "an", "and", "any", "are", "as", "at", "be",
+    "but", "by", "can", "could", "did", "do", "does", "for", "from", "give",
+    "had", "has", "have", "he", "hello", "her", "hey", "hi", "him", "his",
+    "how", "if", "in", "into", "is", "its", "me", "my", "no", "not", "of",
+    "ok", "okay", "on", "or", "our", "please", "she", "so", "tell", "than",
+    "thank", "thanks", "the", "their", "them", "then", "there", "they", "to",
+    "us", "was", "we", "were", "what", "when", "where", "which", "who", "why",
+    "will", "with", "would", "yes", "you", "your"
+})
+
+# Words that refer back to the uploaded document without naming its content
+DOCUMENT_REFERENCE_TERMS = frozenset({
+    "above", "chapter", "diagram", "document", "doc", "exercise", "figure",
+    "file", "it", "page", "pages", "paragraph", "pdf", "problem", "problems",
+    "question", "questions", "section", "summarise", "summarize", "summary",
+    "table", "text", "that", "these", "this", "those", "upload", "uploaded"
+})
+
+
+def _stem(word: str) -> str:
+    """Reduce an English word to a crude stem so inflected forms match.
+    
+    "laws" and "law", or "voting" and "votes", map to the same stem. Only
+    ASCII words are stemmed; other scripts are compared as written.
+    
+    Args:
+        word: Casefolded word
+    
+    Returns:
+        The word's stem
+    """
+    if not word.isascii() or word.endswith("ss"):
+        return word
+    for suffix, replacement in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)] + replacement
+            break
+    return word[:-1] if len(word) > 3 and word.endswith("e") else word
+
+
+def _content_words(text: str) -> set[str]:
+    """Extract stemmed, casefolded content words from text, ignoring stopwords.
+    
+    Args:
+        text: Text to tokenize
+    
+    Returns:
+        Set of content word stems
+    """
+    return {_stem(word) for word in set(_WORD_PATTERN.findall(text.casefold())) - STOPWORDS}
+
+
+def _document_terms(texts: Iterable[str]) -> frozenset[str]:
+    """Build the content-word vocabulary of a document.
+    
+    Every content word is kept rather than a top-N selection, so a query
+    matching any part of the document is routed to retrieval.
+    
+    Args:
+        texts: Text of each document chunk
+    
+    Returns:
+        Frozen set of every content word stem in the document
+    """
+    terms = set()
+    for text in texts:
+        terms |= _content_words(text)
+    return frozenset(terms)
+
+
+def _document_centroid(embeddings: List[List[float]]) -> Optional[np.ndarray]:
+    """Compute the unit-length mean of a document's chunk embeddings.
+    
+    Args:
+        embeddings: One embedding vector per chunk
+    
+    Returns:
+        Normalized centroid vector, or None if there is nothing to average
+    """
+    if not embeddings:
+        return None
+    centroid = np.mean(np.asarray(embeddings, dtype=np.float32), axis=0)
+    norm = np.linalg.norm(centroid)
+    return centroid / norm if norm else None
+
+
+def _marker_prefix_length(text: str) -> int:
+    """Measure the longest end of a text that could begin GENERAL_QUERY_MARKER.
+    
+    Args:
+        text: Reply text received so far
+    
+    Returns:
+        Number of trailing characters to hold back until the next chunk
+    """
+    for length in range(min(len(text), len(GENERAL_QUERY_MARKER) - 1), 0, -1):
+        if text.endswith(GENERAL_QUERY_MARKER[:length]):
+            return length
+    return 0
+
 
 class RAGService:
     """Service for document-based RAG operations."""
@@ -145,6 +271,166 @@ class RAGService:
                 f"Query timed out after {timeout} seconds"
             )
     
+    async def query_session_stream(
+        self,
+        session_id: str,
+        query: str,
+        top_k: int = 5,
+        timeout: int = 15
+    ) -> AsyncIterator[Tuple[Optional[str], Optional[Dict[str, Any]]]]:
+        """Query a document session, streaming the reply as it is generated.
+        
+        PDF answers are forwarded token by token once it is clear the model is
+        not returning a GENERAL_QUERY verdict. A verdict that arrives after
+        some of the reply was forwarded still ends generation and signals the
+        general fallback, as query_session does; the caller must then tell
+        the client to discard the forwarded text. Image sessions are answered
+        through query_session and sent as a single chunk.
+        
+        Args:
+            session_id: Session ID
+            query: User query
+            top_k: Number of chunks to retrieve
+            timeout: Query timeout in seconds
+        
+        Yields:
+            (chunk, None) for each piece of the reply, then a final
+            (None, result) where result has the same shape as the
+            query_session return value
+        
+        Raises:
+            ValueError: If session not found
+            asyncio.TimeoutError: If query exceeds timeout
+        """
+        context = self.session_manager.get_session(session_id)
+        if context is None:
+            raise ValueError(f"Session {session_id} not found or expired")
+        
+        if context.image_data is not None:
+            result = await self.query_session(session_id, query, top_k, timeout)
+            if result["reply"] is not None:
+                yield result["reply"], None
+            yield None, result
+            return
+        
+        logger.info(f"Streaming query for session {session_id}: {query[:50]}...")
+        deadline = asyncio.get_running_loop().time() + timeout
+        
+        try:
+            prompt, source_chunks = await asyncio.wait_for(
+                self._retrieve_context(context, query, top_k),
+                timeout=timeout
+            )
+            
+            if not source_chunks:
+                yield NO_RELEVANT_CONTENT_REPLY, None
+                yield None, {
+                    "reply": NO_RELEVANT_CONTENT_REPLY,
+                    "source_chunks": [],
+                    "metadata": {"chunks_retrieved": 0}
+                }
+                return
+            
+            parts = []
+            pending = ""
+            streaming = False
+            is_general = False
+            stream = self._generate_stream(prompt, deadline)
+            try:
+                async for chunk in stream:
+                    parts.append(chunk)
+                    pending += chunk
+                    if GENERAL_QUERY_MARKER in pending:
+                        # Same verdict as query_session, which finds the marker anywhere
+                        is_general = True
+                        break
+                    
+                    # Hold back the start of the reply until it cannot be a GENERAL_QUERY verdict
+                    if not streaming:
+                        if len(pending) < GENERAL_QUERY_LOOKAHEAD:
+                            continue
+                        pending = pending.lstrip()
+                        streaming = True
+                    
+                    # Forward everything but a tail that could begin the marker
+                    held = _marker_prefix_length(pending)
+                    if len(pending) > held:
+                        yield pending[:len(pending) - held], None
+                        pending = pending[len(pending) - held:]
+            finally:
+                await stream.aclose()
+        except asyncio.TimeoutError:
+            logger.error(f"Query timed out for session {session_id}")
+            raise asyncio.TimeoutError(
+                f"Query timed out after {timeout} seconds"
+            )
+        
+        if is_general:
+            logger.info("RAG detected general query for PDF, signaling fallback")
+            yield None, {
+                "reply": None,  # Signal for general mode
+                "source_chunks": [],
+                "metadata": {"fallback_to_general": True}
+            }
+            return
+        
+        response = "".join(parts).strip()
+        if not streaming:
+            yield response, None
+        elif pending:
+            yield pending, None
+        
+        logger.info(f"Streamed response for session {session_id}")
+        
+        yield None, {
+            "reply": response,
+            "source_chunks": source_chunks,
+            "metadata": {
+                "chunks_retrieved": len(source_chunks),
+                "model": "gemini-2.0-flash"
+            }
+        }
+    
+    async def is_probably_document_query(self, session_id: str, query: str) -> bool:
+        """Cheaply decide whether a query could be about a session's document.
+        
+        Retrieval and the RAG prompt are skipped only on a clearly general
+        verdict: the query has no content words at all (e.g. "hi", "thanks"),
+        or it shares no word stem with the document, does not refer to the
+        document itself (e.g. "summarize this") and its embedding is far from
+        the document's centroid. Image sessions, documents without extracted
+        terms and queries with non-ASCII words always return True, since the
+        embedding model and word matching are unreliable for scripts written
+        without spaces (e.g. Chinese).
+        
+        Args:
+            session_id: Session ID
+            query: User query
+        
+        Returns:
+            False if the query is clearly unrelated to the document, else True
+        """
+        context = self.session_manager.get_session(session_id)
+        if context is None or not context.terms:
+            return True
+        
+        words = set(_WORD_PATTERN.findall(query.casefold()))
+        if not DOCUMENT_REFERENCE_TERMS.isdisjoint(words):
+            return True
+        content_words = words - STOPWORDS
+        if not content_words:
+            return False
+        if not context.terms.isdisjoint(_stem(word) for word in content_words):
+            return True
+        if context.centroid is None or any(not word.isascii() for word in content_words):
+            return True
+        
+        query_embedding = np.asarray(await self.embedding_service.embed_text(query), dtype=np.float32)
+        norm = np.linalg.norm(query_embedding)
+        if not norm:
+            return True
+        return float(np.dot(query_embedding, context.centroid)) / norm >= DOCUMENT_SIMILARITY_THRESHOLD
+    
     async def _process_pdf_internal(self, file_bytes: bytes) -> str:
         """Internal PDF processing logic."""
         logger.info("Processing PDF document")
@@ -155,27 +441,29 @@ class RAGService:
         if not chunks and not images:
             raise ValueError("No content extracted from PDF")
         
-        # Process images with vision model
-        image_descriptions = []
+        # Embed the text chunks while the vision model describes the images
         if images:
             logger.info(f"Processing {len(images)} images with vision model")
-            image_descriptions = await self._process_images_with_vision(images)
+        text_embeddings, image_descriptions = await asyncio.gather(
+            self._embed_chunks(chunks),
+            self._process_images_with_vision(images)
+        )
         
         # Combine text chunks with image descriptions
-        all_chunks = chunks.copy()
-        for desc, page_num in image_descriptions:
-            # Create a chunk for each image description
-            chunk = DocumentChunk(
+        image_chunks = [
+            DocumentChunk(
                 text=f"[Image Description] {desc}",
                 page=page_num,
-                chunk_id=len(all_chunks),
+                chunk_id=len(chunks) + index,
                 metadata={"type": "image_description"}
             )
-            all_chunks.append(chunk)
-        
-        # Generate embeddings for all chunks
+            for index, (desc, page_num) in enumerate(image_descriptions)
+        ]
+        all_chunks = chunks + image_chunks
         chunk_texts = [chunk.text for chunk in all_chunks]
-        embeddings = await self.embedding_service.embed_texts(chunk_texts)
+        
+        # Generate embeddings for the image descriptions
+        embeddings = text_embeddings + await self._embed_chunks(image_chunks)
         
         # Create vector store
         vector_store = VectorStore(self.embedding_service.embedding_dimension)
@@ -203,7 +491,9 @@ class RAGService:
                 "text_chunks": len(chunks),
                 "image_chunks": len(image_descriptions),
                 "total_chunks": len(all_chunks)
-            }
+            },
+            terms=_document_terms(chunk_texts),
+            centroid=_document_centroid(embeddings)
         )
         
         logger.info(
@@ -298,37 +588,15 @@ class RAGService:
             return result
         
         # For PDF/text documents, use traditional RAG
-        # Generate query embedding
-        query_embedding = await self.embedding_service.embed_text(query)
+        prompt, source_chunks = await self._retrieve_context(context, query, top_k)
         
-        # Search vector store
-        results = context.vector_store.search(query_embedding, top_k)
-        
-        if not results:
+        if not source_chunks:
             return {
-                "reply": "I couldn't find relevant information in the document to answer your question.",
+                "reply": NO_RELEVANT_CONTENT_REPLY,
                 "source_chunks": [],
                 "metadata": {"chunks_retrieved": 0}
             }
         
-        # Build context from retrieved chunks
-        context_parts = []
-        source_chunks = []
-        
-        for metadata, distance in results:
-            context_parts.append(
-                f"[Page {metadata['page']}] {metadata['text']}"
-            )
-            source_chunks.append({
-                "page": metadata["page"],
-                "excerpt": metadata["text"][:200] + "..." if len(metadata["text"]) > 200 else metadata["text"],
-                "type": metadata.get("type", "text")
-            })
-        
-        # Build RAG prompt
-        context_text = "\n\n".join(context_parts)
-        prompt = self._build_rag_prompt(context_text, query)
-        
         # Generate response
         loop = asyncio.get_event_loop()
         response = await loop.run_in_executor(
@@ -338,7 +606,7 @@ class RAGService:
         )
         
         # Check if the AI determined this is a general query
-        if "GENERAL_QUERY" in response.strip():
+        if GENERAL_QUERY_MARKER in response.strip():
             logger.info("RAG detected general query for PDF, signaling fallback")
             return {
                 "reply": None,  # Signal for general mode
@@ -352,39 +620,99 @@ class RAGService:
             "reply": response,
             "source_chunks": source_chunks,
             "metadata": {
-                "chunks_retrieved": len(results),
+                "chunks_retrieved": len(source_chunks),
                 "model": "gemini-2.0-flash"
             }
         }
     
+    async def _retrieve_context(
+        self,
+        context,
+        query: str,
+        top_k: int
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """Retrieve the chunks relevant to a query and build the RAG prompt.
+        
+        Args:
+            context: Session context holding the document's vector store
+            query: User query
+            top_k: Number of chunks to retrieve
+        
+        Returns:
+            Tuple of (prompt, source_chunks); source_chunks is empty when
+            nothing relevant was found
+        """
+        # Generate query embedding
+        query_embedding = await self.embedding_service.embed_text(query)
+        
+        # Search vector store
+        results = context.vector_store.search(query_embedding, top_k)
+        
+        if not results:
+            return "", []
+        
+        # Build context from retrieved chunks
+        context_parts = []
+        source_chunks = []
+        
+        for metadata, distance in results:
+            context_parts.append(
+                f"[Page {metadata['page']}] {metadata['text']}"
+            )
+            source_chunks.append({
+                "page": metadata["page"],
+                "excerpt": metadata["text"][:200] + "..." if len(metadata["text"]) > 200 else metadata["text"],
+                "type": metadata.get("type", "text")
+            })
+        
+        # Build RAG prompt
+        context_text = "\n\n".join(context_parts)
+        return self._build_rag_prompt(context_text, query), source_chunks
+    
+    async def _embed_chunks(self, chunks: List[DocumentChunk]) -> List[List[float]]:
+        """Embed the text of document chunks.
+        
+        Args:
+            chunks: Document chunks, possibly empty
+        
+        Returns:
+            One embedding vector per chunk
+        """
+        if not chunks:
+            return []
+        return await self.embedding_service.embed_texts([chunk.text for chunk in chunks])
+    
     async def _process_images_with_vision(
         self,
         images: List[Tuple[bytes, int]]
     ) -> List[Tuple[str, int]]:
         """Process images with vision model to get descriptions.
         
+        Up to VISION_CONCURRENCY images are described at once.
+        
         Args:
             images: List of (image_bytes, page_num) tuples
         
         Returns:
-            List of (description, page_num) tuples
+            List of (description, page_num) tuples, in the order of images
         """
-        descriptions = []
+        semaphore = asyncio.Semaphore(VISION_CONCURRENCY)
         
-        for image_bytes, page_num in images:
+        async def describe(image_bytes: bytes, page_num: int) -> Tuple[str, int]:
             try:
-                description = await self._get_image_description(image_bytes)
-                descriptions.append((description, page_num))
+                async with semaphore:
+                    description = await self._get_image_description(image_bytes)
+                return description, page_num
             except Exception as e:
                 logger.warning(
                     f"Failed to process image from page {page_num}: {e}"
                 )
                 # Add placeholder description
-                descriptions.append(
-                    (f"[Image on page {page_num} - processing failed]", page_num)
-                )
+                return f"[Image on page {page_num} - processing failed]", page_num
         
-        return descriptions
+        return list(await asyncio.gather(
+            *(describe(image_bytes, page_num) for image_bytes, page_num in images)
+        ))
     
     async def _get_image_description(self, image_bytes: bytes) -> str:
         """Get description of an image using vision model.
@@ -429,6 +757,80 @@ class RAGService:
         response = self.text_model.generate_content(prompt)
         return response.text.strip()
     
+    async def _generate_stream(self, prompt: str, deadline: float) -> AsyncIterator[str]:
+        """Stream text generation from a worker thread.
+        
+        Args:
+            prompt: Complete prompt
+            deadline: Event loop time by which generation must finish
+        
+        Yields:
+            Text chunks as the model produces them; chunks that arrive while
+            the consumer is busy are merged into one
+        
+        Raises:
+            asyncio.TimeoutError: If the deadline passes before generation ends
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        worker = loop.run_in_executor(None, self._sync_generate_stream, prompt, queue, loop, stop)
+        deferred = None
+        
+        try:
+            while True:
+                if deferred is not None:
+                    msg_type, data = deferred
+                    deferred = None
+                else:
+                    msg_type, data = await asyncio.wait_for(
+                        queue.get(),
+                        timeout=max(deadline - loop.time(), 0)
+                    )
+                if msg_type == "done":
+                    break
+                if msg_type == "error":
+                    raise data
+                
+                # Merge chunks that queued up while the previous one was being sent
+                parts = [data]
+                while not queue.empty():
+                    item = queue.get_nowait()
+                    if item[0] != "chunk":
+                        deferred = item
+                        break
+                    parts.append(item[1])
+                yield "".join(parts)
+        finally:
+            stop.set()
+            worker.cancel()
+    
+    def _sync_generate_stream(
+        self,
+        prompt: str,
+        queue: asyncio.Queue,
+        loop,
+        stop: threading.Event
+    ) -> None:
+        """Synchronous streaming text generation feeding an async queue.
+        
+        Args:
+            prompt: Complete prompt
+            queue: Queue receiving ("chunk", text), ("error", exc) and ("done", None)
+            loop: Event loop that owns the queue
+            stop: Set when the consumer has gone; the API stream is abandoned
+        """
+        try:
+            for chunk in self.text_model.generate_content(prompt, stream=True):
+                if stop.is_set():
+                    break
+                if chunk.text:
+                    loop.call_soon_threadsafe(queue.put_nowait, ("chunk", chunk.text))
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, ("error", e))
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, ("done", None))
+    
     async def _query_image_with_vision(
         self,
         image_bytes: bytes,
@@ -567,7 +969,7 @@ Answer:"""
         )
         
         # Check if the AI determined this is a general query
-        if "GENERAL_QUERY" in response.strip():
+        if GENERAL_QUERY_MARKER in response.strip():
             logger.info("Vision model detected general query, signaling fallback")
             return None  # Signal to use general agent mode
         
@@ -10,6 +10,7 @@ import time
 import gc
 from typing import Dict, Optional, Any
 from dataclasses import dataclass, field
+import numpy as np
 
 from backend.services.vector_store import VectorStore
 from backend.services.document_processor import DocumentChunk
@@ -28,6 +29,8 @@ class SessionContext:
     expires_at: float
     metadata: Dict[str, Any] = field(default_factory=dict)
     image_data: Optional[bytes] = None  # Store original image for vision queries
+    terms: Optional[frozenset[str]] = None  # Document vocabulary for query routing
+    centroid: Optional[np.ndarray] = None  # Unit-length mean chunk embedding for query routing
     
     def is_expired(self) -> bool:
         """Check if session has expired.
@@ -87,7 +90,9 @@ class SessionManager:
         chunks: list[DocumentChunk],
         metadata: Dict[str, Any] = None,
         ttl_minutes: Optional[int] = None,
-        image_data: Optional[bytes] = None
+        image_data: Optional[bytes] = None,
+        terms: Optional[frozenset[str]] = None,
+        centroid: Optional[np.ndarray] = None
     ) -> str:
         """Create a new ephemeral session.
         
@@ -97,6 +102,8 @@ class SessionManager:
             metadata: Optional session metadata
             ttl_minutes: Optional custom TTL (uses default if not provided)
             image_data: Optional original image data for vision queries
+            terms: Optional set of content words found in the document
+            centroid: Optional unit-length mean of the document's chunk embeddings
         
         Returns:
             Session ID
@@ -117,7 +124,9 @@ class SessionManager:
             created_at=created_at,
             expires_at=expires_at,
             metadata=metadata or {},
-            image_data=image_data
+            image_data=image_data,
+            terms=terms,
+            centroid=centroid
         )
         
         # Store session
@@ -9,12 +9,14 @@ import io
 from PIL import Image
 from fastapi.testclient import TestClient
 from unittest.mock import Mock, patch, AsyncMock
+import numpy as np
 
 from backend.main import create_app
 from backend.services.document_processor import DocumentProcessor, DocumentChunk
 from backend.services.embedding_service import EmbeddingService
 from backend.services.vector_store import VectorStore
 from backend.services.session_manager import SessionManager
+from backend.services.rag_service import RAGService, _document_terms
 
 
 @pytest.fixture
@@ -294,6 +296,133 @@ class TestSessionManager:
         assert info["metadata"]["test"] == "value"
 
 
+class TestQueryRouting:
+    """Test the cheap document/general query pre-filter."""
+    
+    @pytest.fixture
+    def rag_service(self):
+        """Create a RAG service whose query embeddings are unrelated to any document."""
+        embedding_service = Mock()
+        embedding_service.embed_text = AsyncMock(return_value=[0.0, 1.0, 0.0])
+        return RAGService(Mock(gemini_api_key="test-key"), SessionManager(), embedding_service, Mock())
+    
+    def _create_pdf_session(self, rag_service, texts):
+        """Create a PDF session whose centroid is the unit vector [1, 0, 0]."""
+        return rag_service.session_manager.create_session(
+            VectorStore(dimension=384),
+            [DocumentChunk(text, 1, index) for index, text in enumerate(texts)],
+            terms=_document_terms(texts),
+            centroid=np.array([1.0, 0.0, 0.0], dtype=np.float32)
+        )
+    
+    @pytest.mark.asyncio
+    async def test_pdf_session_routing(self, rag_service):
+        """Test only queries unrelated to a PDF's content skip retrieval."""
+        session_id = self._create_pdf_session(rag_service, ["Neural networks are powerful tools"])
+        
+        assert await rag_service.is_probably_document_query(session_id, "How do neural networks learn?")
+        assert await rag_service.is_probably_document_query(session_id, "Summarize this for me")
+        assert not await rag_service.is_probably_document_query(session_id, "hi")
+        assert not await rag_service.is_probably_document_query(session_id, "What is photosynthesis?")
+    
+    @pytest.mark.asyncio
+    async def test_inflected_query_words_match_document(self, rag_service):
+        """Test plural and inflected forms of document words route to retrieval."""
+        session_id = self._create_pdf_session(
+            rag_service, ["Laws protect the fundamental rights of every citizen"]
+        )
+        
+        assert await rag_service.is_probably_document_query(
+            session_id, "what does the law say about voting right"
+        )
+        assert await rag_service.is_probably_document_query(session_id, "Which citizens are protected?")
+        rag_service.embedding_service.embed_text.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_query_close_to_document_centroid_uses_retrieval(self, rag_service):
+        """Test a query with no shared words still queries a semantically close document."""
+        session_id = self._create_pdf_session(rag_service, ["Neural networks are powerful tools"])
+        rag_service.embedding_service.embed_text.return_value = [0.8, 0.6, 0.0]
+        
+        assert await rag_service.is_probably_document_query(session_id, "Explain deep learning")
+    
+    @pytest.mark.asyncio
+    async def test_sessions_without_terms_always_query(self, rag_service):
+        """Test image sessions, unknown sessions and PDFs without terms are never short-circuited."""
+        image_session_id = rag_service.session_manager.create_session(
+            VectorStore(dimension=384),
+            [DocumentChunk("[Image Content] A red square", 1, 0)],
+            image_data=b"image"
+        )
+        empty_session_id = rag_service.session_manager.create_session(
+            VectorStore(dimension=384),
+            [DocumentChunk("...", 1, 0)],
+            terms=frozenset()
+        )
+        
+        assert await rag_service.is_probably_document_query(image_session_id, "What is photosynthesis?")
+        assert await rag_service.is_probably_document_query(empty_session_id, "What is photosynthesis?")
+        assert await rag_service.is_probably_document_query("s_missing", "hi")
+    
+    @pytest.mark.asyncio
+    async def test_non_ascii_document_routing(self, rag_service):
+        """Test documents in non-Latin scripts are never silently skipped."""
+        texts = ["Нейронные сети обучаются на данных", "神经网络是强大的工具"]
+        session_id = self._create_pdf_session(rag_service, texts)
+        
+        assert "нейронные" in _document_terms(texts)
+        assert await rag_service.is_probably_document_query(session_id, "Как обучаются НЕЙРОННЫЕ сети?")
+        assert await rag_service.is_probably_document_query(session_id, "神经网络是什么？")
+        assert not await rag_service.is_probably_document_query(session_id, "What is photosynthesis?")
+
+
+class TestQueryStreaming:
+    """Test streamed document answers."""
+    
+    @pytest.fixture
+    def rag_service(self):
+        """Create a RAG service with one indexed chunk and mocked model dependencies."""
+        embedding_service = Mock()
+        embedding_service.embed_text = AsyncMock(return_value=[0.1] * 4)
+        return RAGService(Mock(gemini_api_key="test-key"), SessionManager(), embedding_service, Mock())
+    
+    async def _stream(self, rag_service, pieces):
+        """Stream a query whose model reply arrives in the given pieces."""
+        vector_store = VectorStore(dimension=4)
+        vector_store.add_vectors([[0.1] * 4], [{"text": "Neural networks", "page": 1, "chunk_id": 0}])
+        session_id = rag_service.session_manager.create_session(
+            vector_store, [DocumentChunk("Neural networks", 1, 0)]
+        )
+        rag_service.text_model = Mock()
+        rag_service.text_model.generate_content.return_value = iter(Mock(text=piece) for piece in pieces)
+        
+        chunks = []
+        async for chunk, result in rag_service.query_session_stream(session_id, "What is this?"):
+            if chunk is not None:
+                chunks.append(chunk)
+        return chunks, result
+    
+    @pytest.mark.asyncio
+    async def test_streamed_reply_matches_result(self, rag_service):
+        """Test the streamed chunks add up to the final reply."""
+        chunks, result = await self._stream(rag_service, ["Neural networks " * 5, "learn from ", "data."])
+        
+        assert "".join(chunks) == result["reply"]
+        assert result["metadata"]["chunks_retrieved"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_late_general_query_marker_falls_back(self, rag_service):
+        """Test a GENERAL_QUERY verdict after a preamble still signals the general fallback."""
+        chunks, result = await self._stream(
+            rag_service, ["TYPE B: this is a general knowledge question. " * 2, "GENERAL", "_QUERY"]
+        )
+        
+        assert chunks, "The preamble should already have been streamed"
+        assert "GENERAL" not in "".join(chunks)
+        assert result["reply"] is None
+        assert result["metadata"]["fallback_to_general"] is True
+
+
 class TestDocumentAPI:
     """Test document API endpoints."""
     
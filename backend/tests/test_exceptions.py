@@ -0,0 +1,60 @@
+"""
+Tests for the centralized exception handlers.
+
+These tests mount the handlers on a minimal FastAPI app, so they run without
+the AI services or the embedding model.
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from backend.api.exceptions import register_exception_handlers
+
+
+class EchoRequest(BaseModel):
+    """Request body with a single string field."""
+    message: str
+
+
+class TestValidationErrors:
+    """Test suite for validation error responses."""
+    
+    @pytest.fixture
+    def client(self):
+        """Create a client for an app with the exception handlers registered."""
+        app = FastAPI()
+        register_exception_handlers(app)
+        
+        @app.post("/echo")
+        async def echo(request: EchoRequest):
+            return {"message": request.message}
+        
+        return TestClient(app)
+    
+    def test_oversized_int_input_returns_400(self, client):
+        """Verify integers outside orjson's 64-bit range are echoed as strings."""
+        response = client.post(
+            "/echo",
+            content=b'{"message": 123456789012345678901234567890}',
+            headers={"Content-Type": "application/json"}
+        )
+        
+        assert response.status_code == 400
+        body = response.json()
+        assert body["success"] is False
+        field_error = body["error"]["details"]["validation_errors"][0]
+        assert field_error["field"] == "message"
+        assert field_error["input"] == "123456789012345678901234567890"
+    
+    def test_nested_oversized_int_input_returns_400(self, client):
+        """Verify oversized integers inside echoed containers still produce a 400."""
+        response = client.post(
+            "/echo",
+            content=b'{"message": [123456789012345678901234567890]}',
+            headers={"Content-Type": "application/json"}
+        )
+        
+        assert response.status_code == 400
+        assert response.json()["error"]["code"] == 400
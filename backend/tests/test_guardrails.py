@@ -8,8 +8,11 @@ This module tests that agents properly reject:
 - Role override attempts
 """
 
+import dataclasses
+import json
+
 import pytest
-from backend.agents.config import AgentManager, AGENTS
+from backend.agents.config import AgentConfig, AgentManager, AGENTS
 
 
 class TestPromptInjectionPrevention:
@@ -175,6 +178,82 @@ class TestAgentConfiguration:
             assert len(agent.system_prompt) > 100, \
                 f"Agent '{agent_id}' system prompt too short"
 
+    def test_get_prompt_matches_agent_prompt(self, agent_manager):
+        """Verify get_prompt returns each enabled agent's system prompt."""
+        for agent_id in agent_manager.list_agent_ids():
+            agent = agent_manager.get_agent(agent_id)
+            assert agent_manager.get_prompt(agent_id) == agent.system_prompt
+
+    def test_list_agents_json_matches_list_agents(self, agent_manager):
+        """Verify the pre-serialized listing matches list_agents."""
+        for include_disabled in (False, True):
+            assert json.loads(agent_manager.list_agents_json(include_disabled)) == \
+                agent_manager.list_agents(include_disabled)
+
+    def test_list_agents_returns_copies(self, agent_manager):
+        """Verify mutating a listed agent does not affect later listings."""
+        agent_manager.list_agents()[0]["name"] = "Changed"
+        
+        assert agent_manager.list_agents()[0]["name"] != "Changed"
+        assert json.loads(agent_manager.list_agents_json()) == agent_manager.list_agents()
+
+    def test_available_agents_lists_enabled_ids(self, agent_manager):
+        """Verify the cached available-agents string matches the enabled IDs."""
+        assert agent_manager.available_agents == ", ".join(agent_manager.list_agent_ids())
+
+    def test_unavailable_message_distinguishes_disabled_agents(self):
+        """Verify disabled agents are reported as disabled rather than missing."""
+        agents = dict(AGENTS)
+        agents["math"] = dataclasses.replace(agents["math"], enabled=False)
+        agent_manager = AgentManager(agents)
+        
+        assert agent_manager.unavailable_message("math") == "Agent 'math' is currently disabled"
+        assert agent_manager.unavailable_message("history") == (
+            f"Agent 'history' not found. Available agents: {agent_manager.available_agents}"
+        )
+        with pytest.raises(KeyError, match="currently disabled"):
+            agent_manager.get_agent("math")
+        assert agent_manager.find_enabled("math") is None
+        assert agent_manager.find_enabled("history") is None
+        assert agent_manager.find_enabled("physics") is agents["physics"]
+
+    def test_agent_config_is_immutable(self, agent_manager):
+        """Verify agent configs cannot be mutated after construction."""
+        agent = agent_manager.get_agent("math")
+        with pytest.raises(AttributeError):
+            agent.enabled = False
+
+    def test_agent_config_strips_identifiers(self):
+        """Verify id and name are stored without surrounding whitespace."""
+        agent = AgentConfig(
+            id="  math ",
+            name=" Mathematics Agent ",
+            description="Ask me about any math topic"
+        )
+        assert agent.id == "math"
+        assert agent.name == "Mathematics Agent"
+
+    def test_agent_config_custom_prompt_path(self, tmp_path):
+        """Verify a config can load its prompt from an explicit file."""
+        prompt_file = tmp_path / "history.md"
+        prompt_file.write_text("You are a history tutor.\n", encoding="utf-8")
+        agent = AgentConfig(
+            id="history",
+            name="History Agent",
+            description="Learn about historical events",
+            system_prompt_path=prompt_file
+        )
+        assert agent.system_prompt == "You are a history tutor."
+
+    def test_agent_config_requires_prompt_file(self):
+        """Verify configs without a system prompt file are rejected."""
+        with pytest.raises(ValueError):
+            AgentConfig(
+                id="history",
+                name="History Agent",
+                description="Learn about historical events"
+            )
+
 
 class TestSecurityKeywords:
     """Test suite for presence of critical security keywords."""